@@ -0,0 +1,21 @@
+// SPDX-License-Identifier: MIT
+
+contract Multicall {
+    error LengthMismatch();
+    error CallFailed(uint256 index, bytes reason);
+
+    function aggregate(address[] calldata targets, bytes[] calldata data) external view returns (bytes[] memory results) {
+        if (targets.length != data.length) revert LengthMismatch();
+
+        results = new bytes[](targets.length);
+        for (uint256 i = 0; i < targets.length; i++) {
+            (bool success, bytes memory result) = targets[i].staticcall(data[i]);
+            if (!success) revert CallFailed(i, result);
+            results[i] = result;
+        }
+    }
+
+    function getEthBalance(address account) external view returns (uint256) {
+        return account.balance;
+    }
+}
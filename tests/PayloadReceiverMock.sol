@@ -1,11 +1,14 @@
 // SPDX-License-Identifier: MIT
 
 contract PayloadReceiverMock {
+    event Received(bytes indexed payload, uint256 value);
+
     bytes public lastPayload;
     uint256 public lastValue;
 
     fallback(bytes calldata payload) external payable returns (bytes memory) {
         lastPayload = payload;
         lastValue = msg.value;
+        emit Received(payload, msg.value);
     }
 }
\ No newline at end of file
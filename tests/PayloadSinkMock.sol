@@ -0,0 +1,5 @@
+// SPDX-License-Identifier: MIT
+
+contract PayloadSinkMock {
+    fallback() external payable {}
+}
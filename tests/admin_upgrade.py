@@ -0,0 +1,35 @@
+from wake.testing import *
+from pytypes.source.contracts.interfaces.IAxelarGateway import IAxelarGateway
+
+from .batching import BlockBatch
+
+
+def admin_upgrade(
+    proxy: IAxelarGateway,
+    implementation: Account,
+    setup_params: bytes,
+    *,
+    gas_limit: int = BlockBatch.GAS_LIMIT,
+) -> TransactionAbc:
+    """
+    Upgrades `proxy` to `implementation` with the votes of the current admins, all mined in a single block.
+
+    Exactly `adminThreshold` admins of `adminEpoch` vote (impersonated), an extra vote would open a new vote
+    on the new implementation. Returns the transaction that reached the threshold and emitted `Upgraded`.
+    """
+    epoch = proxy.adminEpoch()
+    admins = proxy.admins(epoch)
+    threshold = proxy.adminThreshold(epoch)
+    calldata = Abi.encode_call(IAxelarGateway.upgrade, [implementation, keccak256(implementation.code), setup_params])
+
+    txs = []
+    batch = BlockBatch(proxy.chain, gas_limit)
+    for admin in admins[:threshold]:
+        batch.send(proxy, calldata, Account(admin, proxy.chain), on_success=txs.append)
+    batch.mine()
+
+    upgraded = [
+        tx for tx in txs if any(len(e.topics) > 0 and e.topics[0] == IAxelarGateway.Upgraded.selector for e in tx.raw_events)
+    ]
+    assert upgraded == [txs[-1]], "the upgrade did not execute on the last admin vote"
+    return txs[-1]
@@ -0,0 +1,139 @@
+import json
+from typing import Dict, Hashable, Optional, Tuple, Type
+
+from wake.development.core import Contract
+from wake.testing import *
+
+
+CONTRACT_CALL_APPROVED_PREFIX = keccak256(b"contract-call-approved")
+
+
+def contract_call_approved_key(
+    command_id: bytes,
+    source_chain: str,
+    source_address: str,
+    contract_address: Address,
+    payload_hash: bytes,
+) -> bytes:
+    return keccak256(Abi.encode(
+        ["bytes32", "bytes32", "string", "string", "address", "bytes32"],
+        [CONTRACT_CALL_APPROVED_PREFIX, command_id, source_chain, source_address, contract_address, payload_hash],
+    ))
+
+
+def mapping_slot(key: bytes, base_slot: int) -> int:
+    return int.from_bytes(keccak256(Abi.encode(["bytes32", "uint256"], [key, base_slot])), "big")
+
+
+def layout_version(layout_contract: Type[Contract]) -> Optional[bytes]:
+    storage_layout = getattr(layout_contract, "_storage_layout", None)
+    if storage_layout is None:
+        return None
+    return keccak256(json.dumps(storage_layout, sort_keys=True).encode())
+
+
+def bool_mapping_base_slot(layout_contract: Type[Contract]) -> Optional[int]:
+    # gateways keep approvals in the bool mapping of their eternal storage
+    storage_layout = getattr(layout_contract, "_storage_layout", None)
+    if storage_layout is None:
+        return None
+    for item in storage_layout["storage"]:
+        if item["type"] == "t_mapping(t_bytes32,t_bool)":
+            return int(item["slot"])
+    return None
+
+
+class ApprovalSlotResolver:
+    """
+    Resolves the storage slot holding the contract call approval flag of a gateway.
+
+    The slot is derived from the bool mapping in the gateway storage layout and the approval key.
+    The first resolution on a gateway calibrates the mapping base slot against the access-list heuristic
+    (the slot read by `isContractCallApproved` but not by `validateContractCall`) and caches it
+    by `(gateway, layout_version)`; every later approval is computed without a request.
+    If no base slot matches, the heuristic is used for every approval on that gateway.
+
+    `layout_version` defaults to a hash of the `layout_contract` storage layout. Pass a different version
+    (e.g. the implementation code hash) once a gateway proxy is upgraded to an implementation with another layout.
+    """
+    _layout_base_slot: Optional[int]
+    _layout_version: Optional[bytes]
+    _base_slots: Dict[Tuple[Address, Hashable], Optional[int]]
+
+    MAX_BASE_SLOT = 64
+
+    def __init__(self, layout_contract: Type[Contract]):
+        self._layout_base_slot = bool_mapping_base_slot(layout_contract)
+        self._layout_version = layout_version(layout_contract)
+        self._base_slots = {}
+
+    def slot(
+        self,
+        gateway: Account,
+        command_id: bytes,
+        source_chain: str,
+        source_address: str,
+        contract_address: Address,
+        payload_hash: bytes,
+        *,
+        layout_version: Optional[Hashable] = None,
+    ) -> int:
+        key = contract_call_approved_key(command_id, source_chain, source_address, contract_address, payload_hash)
+        cache_key = (gateway.address, self._layout_version if layout_version is None else layout_version)
+
+        if cache_key not in self._base_slots:
+            diff_slot = self._access_list_slot(gateway, command_id, source_chain, source_address, contract_address, payload_hash)
+            candidates = list(range(self.MAX_BASE_SLOT))
+            if self._layout_base_slot is not None:
+                candidates.insert(0, self._layout_base_slot)
+            self._base_slots[cache_key] = next((base for base in candidates if mapping_slot(key, base) == diff_slot), None)
+            if self._base_slots[cache_key] is None:
+                return diff_slot
+
+        base_slot = self._base_slots[cache_key]
+        if base_slot is None:
+            return self._access_list_slot(gateway, command_id, source_chain, source_address, contract_address, payload_hash)
+        return mapping_slot(key, base_slot)
+
+    def approve(
+        self,
+        gateway: Account,
+        command_id: bytes,
+        source_chain: str,
+        source_address: str,
+        contract_address: Address,
+        payload_hash: bytes,
+        *,
+        approved: bool = True,
+        layout_version: Optional[Hashable] = None,
+    ) -> None:
+        slot = self.slot(
+            gateway, command_id, source_chain, source_address, contract_address, payload_hash, layout_version=layout_version
+        )
+        gateway.chain.chain_interface.set_storage_at(str(gateway.address), slot, int(approved).to_bytes(32, "big"))
+
+    @staticmethod
+    def _access_list_slot(
+        gateway: Account,
+        command_id: bytes,
+        source_chain: str,
+        source_address: str,
+        contract_address: Address,
+        payload_hash: bytes,
+    ) -> int:
+        validate_data = Abi.encode_with_signature(
+            "validateContractCall(bytes32,string,string,bytes32)",
+            ["bytes32", "string", "string", "bytes32"],
+            [command_id, source_chain, source_address, payload_hash],
+        )
+        approved_data = Abi.encode_with_signature(
+            "isContractCallApproved(bytes32,string,string,address,bytes32)",
+            ["bytes32", "string", "string", "address", "bytes32"],
+            [command_id, source_chain, source_address, contract_address, payload_hash],
+        )
+        # validateContractCall keys the approval by msg.sender, so the approval slot of `contract_address` stays untouched
+        access_list1, _ = gateway.access_list(validate_data, from_=gateway.chain.accounts[0])
+        access_list2, _ = gateway.access_list(approved_data, from_=gateway.chain.accounts[0])
+        storage_slots = set(access_list2.get(gateway.address, [])) - set(access_list1.get(gateway.address, []))
+        assert len(storage_slots) == 1
+        return next(iter(storage_slots))
@@ -0,0 +1,69 @@
+from typing import Callable, List, Optional, Tuple
+
+from wake.testing import *
+
+
+class BlockBatch:
+    """
+    Transactions of consecutive flows mined together in a single block.
+
+    The first `send` turns automine off; transactions are sent with `confirmations=0` and an explicit gas limit,
+    as the default limit would leave no room for a second transaction in the block. Flows update the Python model
+    right when they queue a transaction. The transactions usually share the same fee, so their order in the block relies
+    on anvil running with `--order fifo` (see wake.toml); `mine` checks that the block executed them in the queued
+    order and then reconciles every receipt: the expected error, or `on_success` for transactions expected to pass.
+    """
+    GAS_LIMIT = 1_000_000
+
+    _chain: Chain
+    _gas_limit: int
+    _automine: bool
+    _queue: List[Tuple[TransactionAbc, Optional[TransactionRevertedError], Optional[Callable[[TransactionAbc], None]]]]
+
+    def __init__(self, chain: Chain, gas_limit: int = GAS_LIMIT):
+        self._chain = chain
+        self._gas_limit = gas_limit
+        self._automine = chain.automine
+        self._queue = []
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def send(
+        self,
+        account: Account,
+        data: bytes,
+        from_: Account,
+        *,
+        value: int = 0,
+        expected_error: Optional[TransactionRevertedError] = None,
+        on_success: Optional[Callable[[TransactionAbc], None]] = None,
+    ) -> None:
+        if len(self._queue) == 0:
+            self._automine = self._chain.automine
+            self._chain.automine = False
+
+        tx = account.transact(data, value=value, from_=from_, gas_limit=self._gas_limit, confirmations=0)
+        self._queue.append((tx, expected_error, on_success))
+
+    def mine(self) -> None:
+        if len(self._queue) == 0:
+            return
+
+        queue = self._queue
+        self._queue = []
+        try:
+            self._chain.mine()
+        finally:
+            self._chain.automine = self._automine
+
+        block_number = queue[0][0].block_number
+        for index, (tx, expected_error, on_success) in enumerate(queue):
+            assert tx.block_number == block_number
+            assert tx.tx_index == index
+            if expected_error is None:
+                assert tx.error is None
+                if on_success is not None:
+                    on_success(tx)
+            else:
+                assert tx.error == expected_error
@@ -0,0 +1,46 @@
+from wake.testing import *
+
+
+class ChainClock:
+    """
+    Python-side lower bound of the timestamp of the next block mined on a chain.
+
+    `advance` and `advance_to` only move the local clock; `flush` applies the pending advance with
+    `set_next_block_timestamp` and must be called before the next transaction. Timestamps of blocks
+    read anyway (e.g. `tx.block.timestamp`) are passed to `sync`.
+    """
+    __slots__ = ("_chain", "_timestamp", "_pending")
+
+    _chain: Chain
+    _timestamp: int
+    _pending: bool
+
+    def __init__(self, chain: Chain):
+        self._chain = chain
+        self._timestamp = chain.blocks["latest"].timestamp
+        self._pending = False
+
+    @property
+    def now(self) -> int:
+        return self._timestamp
+
+    def advance(self, seconds: int) -> None:
+        self._timestamp += seconds
+        self._pending = True
+
+    def advance_to(self, timestamp: int) -> None:
+        if timestamp > self._timestamp:
+            self._timestamp = timestamp
+            self._pending = True
+
+    def sync(self, block_timestamp: int) -> None:
+        self._timestamp = max(self._timestamp, block_timestamp)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+
+        # the node clock keeps running, never set a timestamp lower than the latest block has
+        self._timestamp = max(self._timestamp, self._chain.blocks["latest"].timestamp + 1)
+        self._chain.set_next_block_timestamp(self._timestamp)
+        self._pending = False
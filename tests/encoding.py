@@ -0,0 +1,28 @@
+import functools
+from typing import Any, Callable, Iterable
+
+from wake.testing import *
+
+
+ENCODE_CACHE_SIZE = 4096
+
+
+def _freeze(argument: Any) -> Any:
+    if isinstance(argument, (list, tuple)):
+        return tuple(_freeze(a) for a in argument)
+    if isinstance(argument, bytearray):
+        return bytes(argument)
+    return argument
+
+
+@functools.lru_cache(maxsize=ENCODE_CACHE_SIZE)
+def _encode_call(func: Callable, arguments: tuple) -> bytes:
+    return Abi.encode_call(func, arguments)
+
+
+def encode_call_cached(func: Callable, arguments: Iterable) -> bytes:
+    """
+    `Abi.encode_call` with results kept in a bounded LRU cache keyed on the function and the arguments.
+    Lists and bytearrays in `arguments` are converted to tuples and bytes to make the key hashable.
+    """
+    return _encode_call(func, _freeze(arguments))
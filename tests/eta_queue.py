@@ -0,0 +1,77 @@
+import heapq
+import random
+from typing import Generic, Iterator, List, Optional, Tuple, TypeVar
+
+from .indexed_set import IndexedSet
+
+
+P = TypeVar("P")
+
+
+class EtaQueue(Generic[P]):
+    """
+    Pending timelock proposals split into ready (`eta <= now`) and waiting ones.
+
+    Waiting proposals are also kept in a min-heap keyed on `eta`; `update(now)` moves every proposal
+    with `eta <= now` to the ready set. Removed proposals are dropped from the heap lazily.
+    """
+    __slots__ = ("_ready", "_waiting", "_heap", "_counter")
+
+    _ready: IndexedSet[P]
+    _waiting: IndexedSet[P]
+    _heap: List[Tuple[int, int, P]]
+    _counter: int
+
+    def __init__(self):
+        self._ready = IndexedSet()
+        self._waiting = IndexedSet()
+        self._heap = []
+        self._counter = 0
+
+    def __len__(self) -> int:
+        return len(self._ready) + len(self._waiting)
+
+    def __contains__(self, proposal: object) -> bool:
+        return proposal in self._ready or proposal in self._waiting
+
+    def __iter__(self) -> Iterator[P]:
+        yield from self._ready
+        yield from self._waiting
+
+    @property
+    def ready(self) -> IndexedSet[P]:
+        return self._ready
+
+    @property
+    def waiting(self) -> IndexedSet[P]:
+        return self._waiting
+
+    def add(self, proposal: P) -> None:
+        if proposal in self:
+            return
+        self._waiting.add(proposal)
+        heapq.heappush(self._heap, (proposal.eta, self._counter, proposal))
+        self._counter += 1
+
+    def remove(self, proposal: P) -> None:
+        if proposal in self._ready:
+            self._ready.remove(proposal)
+        else:
+            self._waiting.remove(proposal)
+
+    def update(self, now: int) -> None:
+        while len(self._heap) > 0 and self._heap[0][0] <= now:
+            _, _, proposal = heapq.heappop(self._heap)
+            if proposal in self._waiting:
+                self._waiting.remove(proposal)
+                self._ready.add(proposal)
+
+    def next_eta(self) -> Optional[int]:
+        while len(self._heap) > 0 and self._heap[0][2] not in self._waiting:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if len(self._heap) > 0 else None
+
+    def choice(self) -> P:
+        if random.randrange(len(self)) < len(self._ready):
+            return self._ready.choice()
+        return self._waiting.choice()
@@ -0,0 +1,77 @@
+import os
+from typing import Dict, Iterable, Optional, Tuple, Type, TypeVar
+
+from wake.development.core import Contract
+from wake.testing import *
+
+
+FAST_DEPLOY_ENABLED = os.environ.get("FAST_DEPLOY", "1") == "1"
+
+T = TypeVar("T", bound=Contract)
+
+# runtime code by contract type, constructor arguments replaced with placeholders
+_templates: Dict[Type[Contract], Tuple[bytes, Tuple[bytes, ...]]] = {}
+_deployed_counts: Dict[Chain, int] = {}
+
+
+def _placeholder(index: int) -> bytes:
+    return keccak256(b"fast_deploy placeholder" + index.to_bytes(32, "big"))[12:]
+
+
+def _address_word(argument) -> bytes:
+    if isinstance(argument, Account):
+        argument = argument.address
+    return bytes(12) + bytes.fromhex(str(Address(str(argument)))[2:])
+
+
+def _template(contract_type: Type[Contract], arguments_count: int, chain: Chain) -> Tuple[bytes, Tuple[bytes, ...]]:
+    if contract_type not in _templates:
+        placeholders = tuple(_placeholder(index) for index in range(arguments_count))
+        template = contract_type.deploy(
+            *(Address("0x" + placeholder.hex()) for placeholder in placeholders), from_=chain.accounts[0], chain=chain
+        )
+        code = chain.chain_interface.get_code(str(template.address))
+        for index, placeholder in enumerate(placeholders):
+            if bytes(12) + placeholder not in code:
+                raise ValueError(
+                    f"constructor argument {index} of {contract_type.__name__} is not an immutable, deploy it normally"
+                )
+        _templates[contract_type] = (code, placeholders)
+    return _templates[contract_type]
+
+
+def fast_deploy(
+    contract_type: Type[T],
+    arguments: Iterable = (),
+    *,
+    chain: Chain = default_chain,
+    storage: Optional[Dict[int, int]] = None,
+) -> T:
+    """
+    Places the runtime code of `contract_type` at a fresh deterministic address with `set_code` instead of sending
+    a constructor transaction, and returns the usual pytypes wrapper.
+
+    Only contracts whose constructor arguments are all address immutables are supported: the runtime code is taken
+    once from a template deployed with placeholder addresses, and the placeholders are replaced with `arguments`.
+    Constructor storage writes are not executed, pass them as `storage` (slot -> value). With `FAST_DEPLOY=0`
+    the contract is deployed normally from the first account of the chain.
+    """
+    arguments = list(arguments)
+    if not FAST_DEPLOY_ENABLED:
+        contract = contract_type.deploy(*arguments, from_=chain.accounts[0], chain=chain)
+        for slot, value in (storage or {}).items():
+            chain.chain_interface.set_storage_at(str(contract.address), slot, value.to_bytes(32, "big"))
+        return contract
+
+    code, placeholders = _template(contract_type, len(arguments), chain)
+    for placeholder, argument in zip(placeholders, arguments):
+        code = code.replace(bytes(12) + placeholder, _address_word(argument))
+
+    count = _deployed_counts.get(chain, 0)
+    _deployed_counts[chain] = count + 1
+    address = Address("0x" + keccak256(b"fast_deploy" + chain.chain_id.to_bytes(32, "big") + count.to_bytes(32, "big"))[12:].hex())
+
+    chain.chain_interface.set_code(str(address), code)
+    for slot, value in (storage or {}).items():
+        chain.chain_interface.set_storage_at(str(address), slot, value.to_bytes(32, "big"))
+    return contract_type(address, chain=chain)
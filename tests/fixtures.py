@@ -0,0 +1,32 @@
+from wake.testing import *
+from wake.testing.fuzzing import *
+
+
+class FixtureFuzzTest(FuzzTest):
+    """
+    FuzzTest with a `pre_test` hook deploying infrastructure shared by all sequences.
+
+    `pre_test` runs once before the first sequence. `FuzzTest.run` snapshots every connected chain
+    right before `pre_sequence` and reverts to the snapshot after `post_sequence`, so each sequence starts
+    from the state left by `pre_test`. `pre_sequence` should only deploy contracts with randomized
+    constructor arguments and reset the Python model.
+    """
+    _fixtures_deployed: bool = False
+
+    def pre_test(self) -> None:
+        pass
+
+    def deploy_fixtures(self) -> None:
+        if not self._fixtures_deployed:
+            self.pre_test()
+            self._fixtures_deployed = True
+
+    def run(
+        self,
+        sequences_count: int,
+        flows_count: int,
+        *,
+        dry_run: bool = False,
+    ):
+        self.deploy_fixtures()
+        super().run(sequences_count, flows_count, dry_run=dry_run)
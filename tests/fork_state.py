@@ -0,0 +1,182 @@
+import json
+import os
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, DefaultDict, Dict, Iterator, List, Optional, Set
+
+from wake.development.json_rpc.communicator import JsonRpcCommunicator
+from wake.testing import *
+
+from .profiling import TX_METHODS
+
+
+# calls are traced with `debug_traceCall` before they are sent, transactions by hash once they are mined
+CALL_METHODS = frozenset({"eth_call", "eth_estimateGas", "eth_createAccessList"})
+CALL_FIELDS = ("from", "to", "gas", "value", "data", "input")
+MINE_METHODS = frozenset({"evm_mine", "anvil_mine"})
+PRESTATE_TRACER = {"tracer": "prestateTracer"}
+
+
+def state_digest(block_number: int, block_hash: str, chain_id: int, accounts: Dict[str, Any]) -> str:
+    # the header is part of the digest, a capture relabelled to another block or chain does not verify
+    header = {"block_number": block_number, "block_hash": block_hash, "chain_id": chain_id}
+    return "0x" + keccak256(json.dumps([header, accounts], sort_keys=True, separators=(",", ":")).encode()).hex()
+
+
+class ForkStateRecorder:
+    """
+    Collects the accounts and storage slots a test touches on a forked chain.
+
+    Calls are traced with `debug_traceCall` and the prestate tracer before they are sent. Transactions, sent signed
+    or not, are traced with `debug_traceTransaction` as soon as they are mined - right after they are sent with
+    automine, after the next mine request otherwise. Direct state reads (`eth_getCode`, `eth_getStorageAt`, ...)
+    are recorded as they are.
+    """
+    _slots: DefaultDict[str, Set[int]]
+    _untraced: List[str]
+
+    def __init__(self):
+        self._slots = defaultdict(set)
+        self._untraced = []
+
+    def _record_prestate(self, prestate: Dict[str, Any]) -> None:
+        for address, account in prestate.items():
+            self._slots[address.lower()].update(int(slot, 16) for slot in account.get("storage", {}))
+
+    @contextmanager
+    def installed(self) -> Iterator[None]:
+        recorder = self
+        send_request = JsonRpcCommunicator.send_request
+
+        def trace_mined(communicator: JsonRpcCommunicator) -> None:
+            untraced = []
+            for tx_hash in recorder._untraced:
+                if send_request(communicator, "eth_getTransactionReceipt", [tx_hash]) is None:
+                    untraced.append(tx_hash)
+                else:
+                    recorder._record_prestate(send_request(communicator, "debug_traceTransaction", [tx_hash, PRESTATE_TRACER]))
+            recorder._untraced = untraced
+
+        def recording_send_request(communicator: JsonRpcCommunicator, method_name: str, params=None):
+            if method_name in CALL_METHODS:
+                call = {key: value for key, value in params[0].items() if key in CALL_FIELDS}
+                recorder._record_prestate(send_request(communicator, "debug_traceCall", [call, "latest", PRESTATE_TRACER]))
+            elif method_name in ("eth_getCode", "eth_getBalance", "eth_getTransactionCount"):
+                recorder._slots[params[0].lower()]
+            elif method_name == "eth_getStorageAt":
+                recorder._slots[params[0].lower()].add(int(params[1], 16))
+
+            ret = send_request(communicator, method_name, params)
+            if method_name in TX_METHODS:
+                recorder._untraced.append(ret)
+            if len(recorder._untraced) > 0 and (method_name in TX_METHODS or method_name in MINE_METHODS):
+                trace_mined(communicator)
+            return ret
+
+        JsonRpcCommunicator.send_request = recording_send_request
+        try:
+            yield
+        finally:
+            JsonRpcCommunicator.send_request = send_request
+
+    def capture(self, chain: Chain, block_number: int) -> Dict[str, Any]:
+        assert len(self._untraced) == 0, f"transactions {self._untraced} were never mined, their state is not captured"
+        # values are read at the fork block, so accounts deployed and slots written by the test keep their original state
+        interface = chain.chain_interface
+        accounts = {}
+        for address, slots in sorted(self._slots.items()):
+            code = interface.get_code(address, block_number)
+            balance = interface.get_balance(address, block_number)
+            nonce = interface.get_transaction_count(address, block_number)
+            if len(code) == 0 and balance == 0 and nonce == 0:
+                continue
+
+            storage = {}
+            for slot in sorted(slots):
+                value = interface.get_storage_at(address, slot, block_number)
+                if int.from_bytes(value, "big") != 0:
+                    storage[hex(slot)] = "0x" + value.hex()
+            accounts[address] = {
+                "code": "0x" + code.hex(),
+                "balance": hex(balance),
+                "nonce": nonce,
+                "storage": storage,
+            }
+        return accounts
+
+
+def write_fork_state(path: Path, block_number: int, block_hash: str, chain_id: int, accounts: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        "block_number": block_number,
+        "block_hash": block_hash,
+        "chain_id": chain_id,
+        "digest": state_digest(block_number, block_hash, chain_id, accounts),
+        "accounts": accounts,
+    }, indent=1, sort_keys=True) + "\n")
+
+
+def load_fork_state(
+    chain: Chain, path: Path, block_number: int, chain_id: int, block_hash: Optional[str] = None
+) -> Dict[str, Any]:
+    state = json.loads(path.read_text())
+    assert state["block_number"] == block_number, f"{path} was captured at block {state['block_number']}, not {block_number}"
+    assert state["chain_id"] == chain_id, f"{path} was captured on chain {state['chain_id']}, not {chain_id}"
+    if block_hash is not None:
+        assert state["block_hash"] == block_hash, f"{path} was captured at block hash {state['block_hash']}, not {block_hash}"
+    digest = state_digest(state["block_number"], state["block_hash"], state["chain_id"], state["accounts"])
+    assert digest == state["digest"], f"{path} does not match its digest"
+    assert chain.chain_id == chain_id
+
+    interface = chain.chain_interface
+    for address, account in state["accounts"].items():
+        interface.set_code(address, bytes.fromhex(account["code"][2:]))
+        interface.set_balance(address, int(account["balance"], 16))
+        interface.set_nonce(address, account["nonce"])
+        for slot, value in account["storage"].items():
+            interface.set_storage_at(address, int(slot, 16), bytes.fromhex(value[2:]))
+    return state
+
+
+@contextmanager
+def fork_state(
+    path: Path,
+    fork_url: str,
+    block_number: int,
+    chain: Chain = default_chain,
+    *,
+    chain_id: int = 1,
+    block_hash: Optional[str] = None,
+) -> Iterator[None]:
+    """
+    Runs the body on a fresh local chain (`chain_id`) loaded with the fork state stored at `path`.
+
+    If the file does not exist or `FORK_STATE_CAPTURE=1`, the body runs on a fork of `fork_url` instead, which must be
+    at `block_number` of chain `chain_id`, and the state of the accounts and slots it touched, as of the fork block,
+    is written to `path` once the body passes. Both modes check the block hash against `block_hash` when given;
+    a recapture must also fork the block hash recorded in the existing file.
+    """
+    if block_hash is None:
+        print(f"fork_state: no block hash pinned for block {block_number}, {path} is not verified against the chain")
+    if path.exists() and os.environ.get("FORK_STATE_CAPTURE", "0") != "1":
+        with chain.connect(chain_id=chain_id):
+            load_fork_state(chain, path, block_number, chain_id, block_hash)
+            yield
+        return
+
+    with chain.connect(fork=fork_url):
+        assert chain.chain_id == chain_id, f"{fork_url} is chain {chain.chain_id}, not {chain_id}"
+        fork_block = chain.blocks["latest"]
+        assert fork_block.number == block_number, f"{fork_url} is at block {fork_block.number}, not {block_number}"
+        fork_hash = fork_block.hash
+        if block_hash is not None:
+            assert fork_hash == block_hash, f"fork block hash {fork_hash} differs from the expected {block_hash}"
+        if path.exists():
+            recorded_hash = json.loads(path.read_text())["block_hash"]
+            assert fork_hash == recorded_hash, f"fork block hash {fork_hash} differs from {recorded_hash} recorded in {path}"
+
+        recorder = ForkStateRecorder()
+        with recorder.installed():
+            yield
+        write_fork_state(path, block_number, fork_hash, chain_id, recorder.capture(chain, block_number))
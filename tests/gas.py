@@ -0,0 +1,122 @@
+import json
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import DefaultDict, Dict, List, Optional
+
+from wake.testing import *
+
+
+BASELINES_DIR = Path(__file__).parent / "gas_baselines"
+# gas is gated against the baselines only on request, fuzz runs are then pinned to a fixed base seed
+GAS_BASELINE_CHECK = os.environ.get("GAS_BASELINE_CHECK", "0") == "1"
+GAS_BASELINE_UPDATE = os.environ.get("GAS_BASELINE_UPDATE", "0") == "1"
+GAS_SEED = bytes.fromhex("6761730000000000")
+
+
+def gas_seed() -> Optional[bytes]:
+    # base seed of a fuzz run, None keeps the usual random seeding unless baselines are checked or recorded
+    if not GAS_BASELINE_CHECK and not GAS_BASELINE_UPDATE:
+        return None
+    return bytes.fromhex(os.environ["FUZZ_SEED"]) if "FUZZ_SEED" in os.environ else GAS_SEED
+
+
+def percentile(sorted_samples: List[int], q: float) -> int:
+    # nearest-rank percentile, every reported value is an actual sample
+    index = max(0, -(-len(sorted_samples) * q // 100) - 1)
+    return sorted_samples[int(index)]
+
+
+class GasCollector:
+    """
+    Gas used by logical operations (e.g. `executeProposal`, a multisig vote), recorded from transaction receipts.
+
+    `report` summarizes the samples of every operation into count, min, p50, p99 and max. `check_baseline(name, seed)` prints
+    the report; with `GAS_BASELINE_CHECK=1` it also compares it with `gas_baselines/<name>.json` and fails when the baseline
+    is missing, was recorded with another seed, or p50 or p99 of an operation exceeds it by more than `threshold`
+    (a fraction, `GAS_REGRESSION_THRESHOLD` overrides the default). `GAS_BASELINE_UPDATE=1` (re)writes the baseline.
+    Fuzz runs pass the seed from `gas_seed()`, deterministic tests pass none. The pinned seed fixes the generated
+    workload, not block timestamps, which the threshold has to absorb. Operations missing from the baseline are not gated.
+
+    Worker processes of `run_sharded` record into their own copy of the collector; `dump` and `load` merge the samples back.
+    """
+    THRESHOLD = 0.05
+
+    _samples: DefaultDict[str, List[int]]
+
+    def __init__(self):
+        self._samples = defaultdict(list)
+
+    def __len__(self) -> int:
+        return sum(len(samples) for samples in self._samples.values())
+
+    def record(self, operation: str, tx: TransactionAbc) -> None:
+        self._samples[operation].append(tx.gas_used)
+
+    def clear(self) -> None:
+        self._samples.clear()
+
+    def dump(self, path: Path) -> None:
+        path.write_text(json.dumps(self._samples))
+
+    def load(self, path: Path) -> None:
+        for operation, samples in json.loads(path.read_text()).items():
+            self._samples[operation].extend(samples)
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        report = {}
+        for operation, samples in sorted(self._samples.items()):
+            samples = sorted(samples)
+            report[operation] = {
+                "count": len(samples),
+                "min": samples[0],
+                "p50": percentile(samples, 50),
+                "p99": percentile(samples, 99),
+                "max": samples[-1],
+            }
+        return report
+
+    def format_report(self) -> str:
+        lines = [f"{'operation':<32} {'count':>8} {'min':>10} {'p50':>10} {'p99':>10} {'max':>10}"]
+        for operation, stats in self.report().items():
+            lines.append(
+                f"{operation:<32} {stats['count']:>8} {stats['min']:>10} {stats['p50']:>10} {stats['p99']:>10} {stats['max']:>10}"
+            )
+        return "\n".join(lines)
+
+    def check_baseline(
+        self,
+        name: str,
+        seed: Optional[bytes] = None,
+        threshold: Optional[float] = None,
+        baselines_dir: Path = BASELINES_DIR,
+    ) -> None:
+        if threshold is None:
+            threshold = float(os.environ.get("GAS_REGRESSION_THRESHOLD", self.THRESHOLD))
+        report = self.report()
+        print(self.format_report())
+
+        path = baselines_dir / f"{name}.json"
+        recorded_seed = None if seed is None else seed.hex()
+        if GAS_BASELINE_UPDATE:
+            baselines_dir.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({"seed": recorded_seed, "operations": report}, indent=4, sort_keys=True) + "\n")
+            return
+        if not GAS_BASELINE_CHECK:
+            return
+
+        assert path.exists(), f"gas baseline {path} is missing, record it with GAS_BASELINE_UPDATE=1"
+        baseline = json.loads(path.read_text())
+        assert baseline["seed"] == recorded_seed, (
+            f"{path} was recorded with seed {baseline['seed']}, this run used {recorded_seed}"
+        )
+
+        regressions = []
+        for operation, stats in report.items():
+            if operation not in baseline["operations"]:
+                continue
+            for key in ("p50", "p99"):
+                if stats[key] > baseline["operations"][operation][key] * (1 + threshold):
+                    regressions.append(f"{operation} {key}: {baseline['operations'][operation][key]} -> {stats[key]}")
+
+        assert len(regressions) == 0, f"gas regressions over {threshold:.0%} against {path}:\n" + "\n".join(regressions)
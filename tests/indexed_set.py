@@ -0,0 +1,52 @@
+import random
+from typing import Dict, Generic, Hashable, Iterable, Iterator, List, TypeVar
+
+
+T = TypeVar("T", bound=Hashable)
+
+
+class IndexedSet(Generic[T]):
+    """
+    Set with O(1) add, remove, membership test and uniform random choice.
+
+    Items are kept in a list; removal swaps the last item into the freed position.
+    """
+    __slots__ = ("_items", "_index")
+
+    _items: List[T]
+    _index: Dict[T, int]
+
+    def __init__(self, items: Iterable[T] = ()):
+        self._items = []
+        self._index = {}
+        for item in items:
+            self.add(item)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._index
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._items)
+
+    def add(self, item: T) -> None:
+        if item in self._index:
+            return
+        self._index[item] = len(self._items)
+        self._items.append(item)
+
+    def remove(self, item: T) -> None:
+        index = self._index.pop(item)
+        last = self._items.pop()
+        if index < len(self._items):
+            self._items[index] = last
+            self._index[last] = index
+
+    def discard(self, item: T) -> None:
+        if item in self._index:
+            self.remove(item)
+
+    def choice(self) -> T:
+        return random.choice(self._items)
@@ -0,0 +1,37 @@
+from typing import Generic, Hashable, Iterable, Set, TypeVar
+
+
+T = TypeVar("T", bound=Hashable)
+
+
+class IncrementalCheck(Generic[T]):
+    """
+    Items changed since the last invariant check.
+
+    Every `full_sweep_period`-th check returns all items instead, so state changed outside the model
+    is still caught eventually.
+    """
+    __slots__ = ("_dirty", "_full_sweep_period", "_checks")
+
+    _dirty: Set[T]
+    _full_sweep_period: int
+    _checks: int
+
+    def __init__(self, full_sweep_period: int):
+        self._dirty = set()
+        self._full_sweep_period = full_sweep_period
+        self._checks = 0
+
+    def mark(self, item: T) -> None:
+        self._dirty.add(item)
+
+    def discard(self, item: T) -> None:
+        self._dirty.discard(item)
+
+    def items_to_check(self, items: Iterable[T]) -> Iterable[T]:
+        self._checks += 1
+        dirty = self._dirty
+        self._dirty = set()
+        if self._checks % self._full_sweep_period == 0:
+            return list(items)
+        return dirty
@@ -0,0 +1,49 @@
+from typing import Dict, Iterable, List
+
+from wake.testing import *
+
+from pytypes.tests.Multicall import Multicall
+
+from .multicall import BatchRead
+
+
+class BalanceLedger:
+    """
+    Expected native balances of accounts on a single chain.
+
+    Accounts are funded or tracked once per sequence, value transfers are recorded with `transfer`
+    and `check` compares all tracked balances with the chain in a single batched call.
+    """
+    __slots__ = ("_multicall", "_balances")
+
+    _multicall: Multicall
+    _balances: Dict[Account, int]
+
+    def __init__(self, multicall: Multicall):
+        self._multicall = multicall
+        self._balances = {}
+
+    def __getitem__(self, account: Account) -> int:
+        return self._balances[account]
+
+    def fund(self, account: Account, amount: int) -> None:
+        account.balance = amount
+        self._balances[account] = amount
+
+    def track(self, accounts: Iterable[Account]) -> None:
+        accounts = [account for account in accounts if account not in self._balances]
+        self._balances.update(zip(accounts, self._read(accounts)))
+
+    def transfer(self, from_: Account, to: Account, amount: int) -> None:
+        self._balances[from_] -= amount
+        self._balances[to] += amount
+
+    def check(self) -> None:
+        accounts = list(self._balances.keys())
+        assert self._read(accounts) == [self._balances[account] for account in accounts]
+
+    def _read(self, accounts: List[Account]) -> List[int]:
+        batch = BatchRead(self._multicall)
+        for account in accounts:
+            batch.add(Multicall.getEthBalance, self._multicall, [account])
+        return batch.execute()
@@ -0,0 +1,18 @@
+from typing import List, Tuple
+
+from wake.testing import *
+
+
+def emitted_events(tx: TransactionAbc) -> List[Tuple[str, UnknownEvent]]:
+    """
+    Raw events of `tx` paired with the lowercase address of their emitter, without requesting anything from the node.
+
+    Topics, data and the emitter (`origin`) come from the public `tx.raw_events`.
+    """
+    events = tx.raw_events
+    if len(events) == 0:
+        return []
+    if not hasattr(events[0], "origin"):
+        # Wake 4.0.0 does not set the origin of raw events, the receipt they are built from is in the same order
+        return [(log["address"].lower(), event) for log, event in zip(tx._tx_receipt["logs"], events)]
+    return [(str(event.origin.address).lower(), event) for event in events]
@@ -0,0 +1,79 @@
+from typing import Dict, List, Sequence
+
+from wake.testing import *
+from wake.testing.fuzzing import *
+
+from pytypes.axelarnetwork.axelargmpsdksolidity.contracts.test.MockGateway import MockGateway
+from pytypes.tests.GovernanceMock import GovernanceMock
+
+from .fast_deploy import fast_deploy
+from .relay import Relayer
+
+
+class ChainMesh:
+    """
+    Registry of local chains connected through `MockGateway`s.
+
+    Chain `i` (0-based) is named `chain<i + 1>` on the gateways and connected with chain id `i + 1`;
+    names resolve to chains and back with a dict lookup. `deploy` must be called with all chains connected -
+    it places a gateway and a `GovernanceMock` on every chain (see `fast_deploy`) and installs a `Relayer` delivering messages
+    between any pair of them.
+    """
+    chains: List[Chain]
+    gateways: Dict[Chain, MockGateway]
+    governance_mocks: Dict[Chain, GovernanceMock]
+    relayer: Relayer
+    _names: Dict[Chain, str]
+    _chains: Dict[str, Chain]
+    _indices: Dict[Chain, int]
+
+    def __init__(self, chains: Sequence[Chain]):
+        assert len(chains) >= 2, "a mesh needs at least two chains"
+        self.chains = list(chains)
+        self._indices = {chain: index for index, chain in enumerate(self.chains)}
+        self._names = {chain: f"chain{index + 1}" for chain, index in self._indices.items()}
+        self._chains = {name: chain for chain, name in self._names.items()}
+        self.gateways = {}
+        self.governance_mocks = {}
+
+    @classmethod
+    def create(cls, size: int) -> "ChainMesh":
+        return cls([Chain() for _ in range(size)])
+
+    def __len__(self) -> int:
+        return len(self.chains)
+
+    def name(self, chain: Chain) -> str:
+        return self._names[chain]
+
+    def chain(self, name: str) -> Chain:
+        return self._chains[name]
+
+    def chain_ids(self) -> Dict[Chain, int]:
+        return {chain: index + 1 for chain, index in self._indices.items()}
+
+    def random_other(self, chain: Chain) -> Chain:
+        # uniform over the other chains without building the list
+        index = random_int(0, len(self.chains) - 2)
+        if index >= self._indices[chain]:
+            index += 1
+        return self.chains[index]
+
+    def deploy(self, deployer: Address, *, deferred: bool = False, delivery_delay: int = 0) -> None:
+        assert all(chain.accounts[0].address == deployer for chain in self.chains)
+
+        self.gateways = {
+            chain: fast_deploy(MockGateway, chain=chain) for chain in self.chains
+        }
+        self.relayer = Relayer(
+            self.gateways,
+            self._names,
+            deployer,
+            direct_approvals=True,
+            deferred=deferred,
+            delivery_delay=delivery_delay,
+        )
+        self.relayer.install()
+        self.governance_mocks = {
+            chain: fast_deploy(GovernanceMock, [self.gateways[chain]], chain=chain) for chain in self.chains
+        }
@@ -0,0 +1,83 @@
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Tuple
+
+from wake.testing import *
+
+
+class GovernanceCommand(IntEnum):
+    SCHEDULE_TIME_LOCK_PROPOSAL = 0
+    CANCEL_TIME_LOCK_PROPOSAL = 1
+    APPROVE_MULTISIG_PROPOSAL = 2
+    CANCEL_MULTISIG_APPROVAL = 3
+
+
+def proposal_hash(target: Address, calldata: bytes, native_value: int) -> bytes:
+    return keccak256(Abi.encode_packed(
+        ["address", "bytes", "uint256"],
+        [target, calldata, native_value],
+    ))
+
+
+# the hash is computed once per proposal and is not part of __eq__, __hash__ or __repr__
+@dataclass(frozen=True)
+class Proposal:
+    target: Address
+    calldata: bytes
+    native_value: uint256
+    eta: uint256
+    _hash: bytes = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_hash", proposal_hash(self.target, self.calldata, self.native_value))
+
+    @property
+    def hash(self) -> bytes:
+        return self._hash
+
+    def schedule_payload(self) -> bytes:
+        # payload sent by GovernanceMock.scheduleProposal
+        return Abi.encode(
+            ["uint256", "address", "bytes", "uint256", "uint256"],
+            [GovernanceCommand.SCHEDULE_TIME_LOCK_PROPOSAL, self.target, self.calldata, self.native_value, self.eta],
+        )
+
+
+@dataclass(frozen=True)
+class MultisigProposal:
+    target: Address
+    calldata: bytes
+    native_value: uint256
+    _hash: bytes = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_hash", proposal_hash(self.target, self.calldata, self.native_value))
+
+    @property
+    def hash(self) -> bytes:
+        return self._hash
+
+    def approve_payload(self) -> bytes:
+        # payload sent by GovernanceMock.approveMultisig
+        return Abi.encode(
+            ["uint256", "address", "bytes", "uint256"],
+            [GovernanceCommand.APPROVE_MULTISIG_PROPOSAL, self.target, self.calldata, self.native_value],
+        )
+
+    def cancel_approval_payload(self) -> bytes:
+        # payload sent by GovernanceMock.cancelMultisigApproval
+        return Abi.encode(
+            ["uint256", "address", "bytes", "uint256"],
+            [GovernanceCommand.CANCEL_MULTISIG_APPROVAL, self.target, self.calldata, self.native_value],
+        )
+
+
+def decode_command(payload: bytes) -> Tuple[GovernanceCommand, Proposal]:
+    # payloads sent by GovernanceMock, only scheduling carries an eta - it is 0 for the other commands
+    command = GovernanceCommand(int.from_bytes(payload[:32], "big"))
+    if command == GovernanceCommand.SCHEDULE_TIME_LOCK_PROPOSAL:
+        _, target, calldata, native_value, eta = Abi.decode(["uint256", "address", "bytes", "uint256", "uint256"], payload)
+    else:
+        _, target, calldata, native_value = Abi.decode(["uint256", "address", "bytes", "uint256"], payload)
+        eta = 0
+    return command, Proposal(target, calldata, native_value, eta)
@@ -0,0 +1,54 @@
+from typing import Any, Callable, Iterable, List, Union
+
+import eth_utils
+from wake.testing import *
+from wake.utils import get_class_that_defined_method
+
+from pytypes.tests.Multicall import Multicall
+
+
+class BatchRead:
+    """
+    View calls collected with `add` and executed in a single `eth_call` through `Multicall.aggregate`.
+
+    `func` is a pytypes method, e.g. `InterchainGovernance.getTimeLock`; its return values are decoded
+    with the outputs from the contract ABI. Functions with a single output return the value itself.
+    """
+    _multicall: Multicall
+    _targets: List[Address]
+    _calls: List[bytes]
+    _output_types: List[List[str]]
+
+    def __init__(self, multicall: Multicall):
+        self._multicall = multicall
+        self._targets = []
+        self._calls = []
+        self._output_types = []
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def add(self, func: Callable, target: Union[Account, Address], arguments: Iterable = ()) -> int:
+        contract = get_class_that_defined_method(func)
+        self._targets.append(target.address if isinstance(target, Account) else target)
+        self._calls.append(Abi.encode_call(func, arguments))
+        self._output_types.append([
+            eth_utils.abi.collapse_if_tuple(output)
+            for output in contract._abi[func.selector]["outputs"]
+        ])
+        return len(self._calls) - 1
+
+    def execute(self) -> List[Any]:
+        if len(self._calls) == 0:
+            return []
+
+        results = self._multicall.aggregate(self._targets, self._calls, request_type="call")
+        decoded = []
+        for types, result in zip(self._output_types, results):
+            values = Abi.decode(types, result)
+            decoded.append(values[0] if len(values) == 1 else values)
+
+        self._targets = []
+        self._calls = []
+        self._output_types = []
+        return decoded
@@ -0,0 +1,166 @@
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import traceback
+from contextlib import ExitStack, redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from wake.testing import *
+from wake.testing.fuzzing import *
+
+from .fixtures import FixtureFuzzTest
+from .gas import GasCollector
+
+
+def sequence_seed(base_seed: bytes, sequence_index: int) -> bytes:
+    return keccak256(base_seed + sequence_index.to_bytes(32, "big"))[:8]
+
+
+def _run_shard(
+    fuzz_test: Callable[[], FuzzTest],
+    chains: Dict[Chain, int],
+    sequences: List[int],
+    flows_count: int,
+    base_seed: bytes,
+    log_path: Path,
+    results: multiprocessing.Queue,
+    revert_handler: Optional[Callable[[TransactionRevertedError], None]],
+    gas: Optional[GasCollector],
+    gas_path: Path,
+) -> None:
+    with open(log_path, "w") as f, redirect_stdout(f), redirect_stderr(f), ExitStack() as stack:
+        logging.basicConfig(stream=f, force=True)
+
+        try:
+            for chain, chain_id in chains.items():
+                stack.enter_context(chain.connect(chain_id=chain_id))
+
+            test = fuzz_test()
+            if isinstance(test, FixtureFuzzTest):
+                test.deploy_fixtures()
+        except Exception:
+            traceback.print_exc()
+            for sequence_index in sequences:
+                results.put((sequence_index, sequence_seed(base_seed, sequence_index), traceback.format_exc()))
+            return
+
+        for sequence_index in sequences:
+            seed = sequence_seed(base_seed, sequence_index)
+            print(f"Running sequence {sequence_index} with seed {seed.hex()}")
+            random.seed(seed)
+            # every sequence runs as `test.run(1, ...)`, so `sequence_num` is always 0 - report the sharded index instead
+            test.sharded_sequence = (sequence_index, seed)
+            # FuzzTest.run only reverts the chains when the sequence finishes
+            snapshots = {chain: chain.snapshot() for chain in chains.keys()}
+            try:
+                test.run(1, flows_count)
+                results.put((sequence_index, seed, None))
+            except Exception as e:
+                if isinstance(e, TransactionRevertedError) and revert_handler is not None:
+                    revert_handler(e)
+                traceback.print_exc()
+                results.put((sequence_index, seed, traceback.format_exc()))
+                for chain, snapshot in snapshots.items():
+                    chain.revert(snapshot)
+
+        if gas is not None:
+            gas.dump(gas_path)
+
+
+def run_sharded(
+    fuzz_test: Callable[[], FuzzTest],
+    chains: Dict[Chain, int],
+    sequences_count: int,
+    flows_count: int,
+    *,
+    processes: Optional[int] = None,
+    base_seed: Optional[bytes] = None,
+    logs_dir: Path = Path(".wake/logs/sharded"),
+    revert_handler: Optional[Callable[[TransactionRevertedError], None]] = None,
+    gas: Optional[GasCollector] = None,
+) -> None:
+    """
+    Runs `sequences_count` sequences of a fuzz test in worker processes.
+
+    Every worker connects its own instances of `chains` (chain -> chain id) and runs the sequences
+    with `index % processes == worker index`. Each sequence is seeded with `sequence_seed(base_seed, index)`,
+    so a failing sequence can be reproduced alone with `FUZZ_SEED=<base seed> FUZZ_SEQUENCE=<index>`.
+    `FUZZ_PROCESSES` overrides the number of workers, which defaults to the number of CPUs.
+    Samples recorded into `gas` by the workers are merged into it once all of them finish.
+    Before each sequence the test gets `sharded_sequence = (index, seed)`, read by `profiled` tests.
+    """
+    if base_seed is None:
+        base_seed = bytes.fromhex(os.environ["FUZZ_SEED"]) if "FUZZ_SEED" in os.environ else random.getrandbits(64).to_bytes(8, "big")
+    if "FUZZ_SEQUENCE" in os.environ:
+        sequence_indices = [int(os.environ["FUZZ_SEQUENCE"])]
+    else:
+        sequence_indices = list(range(sequences_count))
+    if processes is None:
+        processes = int(os.environ.get("FUZZ_PROCESSES", os.cpu_count() or 1))
+    processes = max(1, min(processes, len(sequence_indices)))
+
+    name = getattr(fuzz_test, "__name__", "fuzz_test")
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    print(f"Running {len(sequence_indices)} sequences of {name} in {processes} processes with base seed {base_seed.hex()}")
+
+    # workers inherit the module-level chains and the classes built by `profiled`, neither can be pickled for spawn
+    ctx = multiprocessing.get_context("fork")
+    results: multiprocessing.Queue = ctx.Queue()
+    workers = []
+    log_paths = []
+    gas_paths = []
+    for i in range(processes):
+        log_path = logs_dir / f"{name}_{i}.log"
+        log_paths.append(log_path)
+        gas_path = logs_dir / f"{name}_{i}.gas.json"
+        gas_path.unlink(missing_ok=True)
+        gas_paths.append(gas_path)
+        p = ctx.Process(
+            target=_run_shard,
+            args=(fuzz_test, chains, sequence_indices[i::processes], flows_count, base_seed, log_path, results, revert_handler, gas, gas_path),
+        )
+        p.start()
+        workers.append(p)
+
+    failures = []
+    finished = set()
+    while len(finished) < len(sequence_indices):
+        try:
+            sequence_index, seed, error = results.get(timeout=1)
+        except queue.Empty:
+            if any(p.is_alive() for p in workers):
+                continue
+            # a worker died without reporting all of its sequences
+            for sequence_index in set(sequence_indices) - finished:
+                failures.append((sequence_index, sequence_seed(base_seed, sequence_index), "worker process exited unexpectedly"))
+            break
+        finished.add(sequence_index)
+        if error is not None:
+            failures.append((sequence_index, seed, error))
+
+    for p in workers:
+        p.join()
+
+    if gas is not None:
+        for gas_path in gas_paths:
+            if gas_path.exists():
+                gas.load(gas_path)
+
+    with open(logs_dir / f"{name}.log", "w") as merged:
+        for i, log_path in enumerate(log_paths):
+            merged.write(f"===== process #{i} =====\n")
+            merged.write(log_path.read_text())
+
+    if len(failures) > 0:
+        failures.sort()
+        for sequence_index, seed, error in failures:
+            print(f"Sequence {sequence_index} (seed {seed.hex()}) failed:\n{error}", file=sys.stderr)
+        raise AssertionError(
+            f"{len(failures)} of {len(sequence_indices)} sequences failed, "
+            f"reproduce with FUZZ_SEED={base_seed.hex()} FUZZ_SEQUENCE=<sequence>: "
+            + ", ".join(f"sequence {sequence_index} (seed {seed.hex()})" for sequence_index, seed, _ in failures)
+        )
@@ -0,0 +1,233 @@
+import functools
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Type
+
+from wake.development.json_rpc.communicator import JsonRpcCommunicator
+from wake.testing import *
+from wake.testing.core import get_connected_chains
+from wake.testing.fuzzing import *
+
+from .relay import Relayer
+
+
+PROFILE_ENABLED = os.environ.get("FUZZ_PROFILE", "0") == "1"
+PROFILES_DIR = Path(".wake/profiles")
+# upper bounds of the wall time histogram buckets in milliseconds, the last bucket is unbounded
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000)
+TX_METHODS = frozenset({"eth_sendTransaction", "eth_sendRawTransaction", "eth_sendUnsignedTransaction"})
+
+
+class SectionStats:
+    __slots__ = ("calls", "time", "relay_time", "histogram", "requests", "transactions")
+
+    calls: int
+    time: float
+    relay_time: float
+    histogram: List[int]
+    requests: Counter
+    transactions: int
+
+    def __init__(self):
+        self.calls = 0
+        self.time = 0.0
+        self.relay_time = 0.0
+        self.histogram = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.requests = Counter()
+        self.transactions = 0
+
+    def add_call(self, elapsed: float) -> None:
+        self.calls += 1
+        self.time += elapsed
+        elapsed_ms = elapsed * 1000
+        self.histogram[next((i for i, bound in enumerate(HISTOGRAM_BUCKETS_MS) if elapsed_ms <= bound), -1)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "time": self.time,
+            "mean_ms": self.time / self.calls * 1000 if self.calls > 0 else None,
+            "relay_time": self.relay_time,
+            "histogram_ms": dict(zip([str(bound) for bound in HISTOGRAM_BUCKETS_MS] + ["inf"], self.histogram)),
+            "requests": dict(self.requests.most_common()),
+            "transactions": self.transactions,
+        }
+
+
+class FlowProfiler:
+    """
+    Wall time, JSON-RPC requests and transactions of the flows and invariants of a fuzz test.
+
+    Every request and relay is attributed to the innermost running section - a flow, an invariant, or `other`
+    (hooks, `pre_sequence`, fixtures). Relay time is the time spent in `Relayer.deliver` and is also included
+    in the time of the section it happened in.
+    """
+    _sections: Dict[str, SectionStats]
+    _current: str
+    _relaying: bool
+    _installed: bool
+    sequences: List[Dict[str, Any]]
+
+    def __init__(self):
+        self._sections = {}
+        self._current = "other"
+        self._relaying = False
+        self._installed = False
+        self.sequences = []
+
+    def section(self, name: str) -> SectionStats:
+        if name not in self._sections:
+            self._sections[name] = SectionStats()
+        return self._sections[name]
+
+    def measure(self, name: str, fn: Callable, *args) -> Any:
+        previous = self._current
+        self._current = name
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.section(name).add_call(time.perf_counter() - start)
+            self._current = previous
+
+    def total_requests(self) -> int:
+        return sum(sum(stats.requests.values()) for stats in self._sections.values())
+
+    def total_transactions(self) -> int:
+        return sum(stats.transactions for stats in self._sections.values())
+
+    @contextmanager
+    def installed(self) -> Iterator[None]:
+        # FixtureFuzzTest.run deploys the fixtures from within run, patch only once
+        if self._installed:
+            yield
+            return
+
+        profiler = self
+        send_request = JsonRpcCommunicator.send_request
+        deliver = Relayer.deliver
+
+        def profiled_send_request(communicator: JsonRpcCommunicator, method_name: str, params=None):
+            stats = profiler.section(profiler._current)
+            stats.requests[method_name] += 1
+            if method_name in TX_METHODS:
+                stats.transactions += 1
+            return send_request(communicator, method_name, params)
+
+        def profiled_deliver(relayer: Relayer, message):
+            # a relay triggered from a relayed transaction is already being measured
+            if profiler._relaying:
+                return deliver(relayer, message)
+            profiler._relaying = True
+            start = time.perf_counter()
+            try:
+                return deliver(relayer, message)
+            finally:
+                profiler.section(profiler._current).relay_time += time.perf_counter() - start
+                profiler._relaying = False
+
+        JsonRpcCommunicator.send_request = profiled_send_request
+        Relayer.deliver = profiled_deliver
+        self._installed = True
+        try:
+            yield
+        finally:
+            JsonRpcCommunicator.send_request = send_request
+            Relayer.deliver = deliver
+            self._installed = False
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "sections": {name: stats.to_dict() for name, stats in sorted(self._sections.items())},
+            "sequences": self.sequences,
+        }
+
+
+def _profiled_method(name: str, fn: Callable) -> Callable:
+    @functools.wraps(fn)
+    def wrapper(self, *args):
+        return self._profiler.measure(name, fn, self, *args)
+
+    return wrapper
+
+
+def profiled(fuzz_test: Type[FuzzTest]) -> Type[FuzzTest]:
+    """
+    Returns a subclass of `fuzz_test` with every flow and invariant measured by a `FlowProfiler`, or `fuzz_test`
+    itself unless `FUZZ_PROFILE=1`. The wrappers keep the names and flow weights, so a seed selects the same flows.
+
+    After every sequence a summary line (flows/s, requests, transactions, blocks mined) is printed and the report
+    of the process is written to `.wake/profiles/<test>_<pid>.json`. Under `run_sharded` sequences are identified by
+    their sharded index and seed.
+    """
+    if not PROFILE_ENABLED:
+        return fuzz_test
+
+    namespace: Dict[str, Any] = {}
+    for name in dir(fuzz_test):
+        attr = getattr(fuzz_test, name)
+        if getattr(attr, "flow", False) or getattr(attr, "invariant", False):
+            namespace[name] = _profiled_method(name, attr)
+
+    def __init__(self, *args, **kwargs):
+        fuzz_test.__init__(self, *args, **kwargs)
+        self._profiler = FlowProfiler()
+
+    def run(self, sequences_count: int, flows_count: int, **kwargs):
+        with self._profiler.installed():
+            fuzz_test.run(self, sequences_count, flows_count, **kwargs)
+
+    def deploy_fixtures(self):
+        with self._profiler.installed():
+            self._profiler.measure("pre_test", fuzz_test.deploy_fixtures, self)
+
+    def pre_sequence(self):
+        fuzz_test.pre_sequence(self)
+        self._sequence_start = (
+            time.perf_counter(),
+            self._profiler.total_requests(),
+            self._profiler.total_transactions(),
+            {chain: chain.blocks["latest"].number for chain in get_connected_chains()},
+        )
+
+    def post_sequence(self):
+        fuzz_test.post_sequence(self)
+        start, requests, transactions, blocks = self._sequence_start
+        elapsed = time.perf_counter() - start
+        flows = self.flow_num + 1
+        # sharded runs run every sequence alone, see run_sharded
+        sequence, seed = getattr(self, "sharded_sequence", (self.sequence_num, None))
+        summary = {
+            "sequence": sequence,
+            "seed": None if seed is None else seed.hex(),
+            "flows": flows,
+            "time": elapsed,
+            "flows_per_second": flows / elapsed,
+            "requests": self._profiler.total_requests() - requests,
+            "transactions": self._profiler.total_transactions() - transactions,
+            "blocks": sum(chain.blocks["latest"].number - number for chain, number in blocks.items()),
+        }
+        self._profiler.sequences.append(summary)
+        label = f"Sequence {sequence}" if seed is None else f"Sequence {sequence} (seed {seed.hex()})"
+        print(
+            f"{label}: {flows} flows in {elapsed:.2f} s ({summary['flows_per_second']:.1f} flows/s), "
+            f"{summary['requests']} requests, {summary['transactions']} transactions, {summary['blocks']} blocks"
+        )
+
+        PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+        report_path = PROFILES_DIR / f"{fuzz_test.__name__}_{os.getpid()}.json"
+        report_path.write_text(json.dumps(self._profiler.report(), indent=4) + "\n")
+
+    namespace.update(
+        __init__=__init__,
+        run=run,
+        pre_sequence=pre_sequence,
+        post_sequence=post_sequence,
+    )
+    if hasattr(fuzz_test, "deploy_fixtures"):
+        namespace["deploy_fixtures"] = deploy_fixtures
+    return type(fuzz_test.__name__, (fuzz_test,), namespace)
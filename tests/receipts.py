@@ -0,0 +1,28 @@
+from typing import List, Tuple
+
+from wake.testing import *
+
+from pytypes.tests.PayloadReceiverMock import PayloadReceiverMock
+
+from .logs import emitted_events
+
+
+def receipt_logs(tx: TransactionAbc, emitter: Account, selector: bytes) -> List[Tuple[List[bytes], bytes]]:
+    """
+    Topics and data of the `selector` events emitted by `emitter`, read from the receipt the transaction already holds.
+    Unlike `tx.events`, no logs or traces are requested from the node.
+    """
+    address = str(emitter.address).lower()
+    return [
+        (event.topics, event.data)
+        for event_address, event in emitted_events(tx)
+        if event_address == address and len(event.topics) > 0 and event.topics[0] == selector
+    ]
+
+
+def received(tx: TransactionAbc, target: Account) -> List[Tuple[bytes, int]]:
+    # (keccak256 of the payload, value) of every Received event emitted by the target
+    return [
+        (topics[1], int.from_bytes(data, "big"))
+        for topics, data in receipt_logs(tx, target, PayloadReceiverMock.Received.selector)
+    ]
@@ -0,0 +1,250 @@
+import random
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+
+import eth_abi
+from wake.testing import *
+
+from pytypes.axelarnetwork.axelargmpsdksolidity.contracts.interfaces.IAxelarExecutable import IAxelarExecutable
+from pytypes.axelarnetwork.axelargmpsdksolidity.contracts.test.MockGateway import MockGateway
+
+from .approvals import ApprovalSlotResolver
+from .logs import emitted_events
+
+
+class EventShape(NamedTuple):
+    # non-indexed event parameters, decoded with eth_abi directly as none of them needs Wake's output normalization
+    types: List[str]
+    handler: Callable[[TransactionAbc, int, List[bytes], tuple], None]
+
+    def decode(self, data: bytes) -> tuple:
+        return eth_abi.abi.decode(self.types, data)
+
+
+class Message(NamedTuple):
+    # ContractCall message waiting for delivery in the deferred mode
+    source_chain: Chain
+    sender: Address
+    destination_chain: Chain
+    destination_address: Address
+    payload: bytes
+    payload_hash: bytes
+    tx_hash: bytes
+    log_index: int
+    round: int
+
+
+class Relayer:
+    """
+    Delivers `ContractCall` and `ContractCallWithToken` events emitted by a set of `MockGateway`s
+    to the destination chain, emulating the Axelar network.
+
+    Install with `relayer.install()` - every connected chain gets the relayer as its `tx_callback`.
+
+    With `direct_approvals=True`, `ContractCall` messages are approved by writing the gateway approval flag
+    directly to storage instead of sending `approveContractCall`, so every relayed message mines a single transaction.
+    `ContractCallWithToken` messages are always approved with a transaction, as the approval also mints tokens.
+
+    With `deferred=True`, `ContractCall` messages are not delivered from the source transaction but queued
+    per destination chain. `take` removes up to `max_count` messages that have waited through at least
+    `delivery_delay` earlier calls of `take`, in the queue order or shuffled, and `deliver` approves and executes one of them.
+    `ContractCallWithToken` messages are still delivered right away.
+    """
+    _chains: Dict[str, Chain]
+    _chain_names: Dict[Chain, str]
+    _gateways: Dict[Chain, MockGateway]
+    _gateway_addresses: Dict[Chain, Set[str]]
+    _shapes: Dict[bytes, EventShape]
+    _relayer: Address
+    _approvals: Optional[ApprovalSlotResolver]
+    _queues: Dict[Chain, List[Message]]
+    _delivery_delay: int
+    _round: int
+    deferred: bool
+    command_counter: int
+    last_tx: Optional[TransactionAbc]
+
+    def __init__(
+        self,
+        gateways: Dict[Chain, MockGateway],
+        chain_names: Dict[Chain, str],
+        relayer: Address,
+        *,
+        direct_approvals: bool = False,
+        deferred: bool = False,
+        delivery_delay: int = 0,
+    ):
+        self._gateways = gateways
+        self._chain_names = chain_names
+        self._chains = {name: chain for chain, name in chain_names.items()}
+        self._gateway_addresses = {
+            chain: {str(gateway.address).lower()} for chain, gateway in gateways.items()
+        }
+        self._shapes = {
+            MockGateway.ContractCall.selector: EventShape(
+                ["string", "string", "bytes"],
+                self._relay_contract_call,
+            ),
+            MockGateway.ContractCallWithToken.selector: EventShape(
+                ["string", "string", "bytes", "string", "uint256"],
+                self._relay_contract_call_with_token,
+            ),
+        }
+        self._relayer = relayer
+        self._approvals = ApprovalSlotResolver(MockGateway) if direct_approvals else None
+        self._queues = {chain: [] for chain in gateways.keys()}
+        self._delivery_delay = delivery_delay
+        self._round = 0
+        self.deferred = deferred
+        self.command_counter = 0
+        self.last_tx = None
+
+    def install(self) -> None:
+        for chain in self._gateways.keys():
+            chain.tx_callback = self.relay
+
+    def relay(self, tx: TransactionAbc) -> None:
+        # reverted transactions and transactions without events are skipped without any decoding
+        gateway_addresses = self._gateway_addresses[tx.chain]
+        for index, (address, event) in enumerate(emitted_events(tx)):
+            if address not in gateway_addresses or len(event.topics) == 0:
+                continue
+
+            shape = self._shapes.get(event.topics[0])
+            if shape is None:
+                continue
+
+            shape.handler(tx, index, event.topics, shape.decode(event.data))
+
+    def pending(self, destination_chain: Chain) -> int:
+        return len(self._queues[destination_chain])
+
+    def clear(self) -> None:
+        for queue in self._queues.values():
+            queue.clear()
+
+    def take(self, destination_chain: Chain, max_count: int, *, reorder: bool = False) -> List[Message]:
+        self._round += 1
+        queue = self._queues[destination_chain]
+        # messages are queued in rounds order, the deliverable ones form a prefix
+        deliverable = 0
+        while deliverable < len(queue) and self._round - queue[deliverable].round > self._delivery_delay:
+            deliverable += 1
+
+        if reorder:
+            indices = sorted(random.sample(range(deliverable), min(max_count, deliverable)))
+            messages = [queue[i] for i in indices]
+            for i in reversed(indices):
+                queue.pop(i)
+            random.shuffle(messages)
+        else:
+            messages = queue[:min(max_count, deliverable)]
+            del queue[:len(messages)]
+        return messages
+
+    def deliver(self, message: Message) -> TransactionAbc:
+        source_chain_name = self._chain_names[message.source_chain]
+        command_id = self._next_command_id()
+
+        if self._approvals is not None:
+            self._approvals.approve(
+                self._gateways[message.destination_chain],
+                command_id,
+                source_chain_name,
+                str(message.sender),
+                message.destination_address,
+                message.payload_hash,
+            )
+        else:
+            self._gateways[message.destination_chain].approveContractCall(Abi.encode(
+                ["string", "string", "address", "bytes32", "bytes32", "uint256"],
+                [source_chain_name, str(message.sender), message.destination_address, message.payload_hash, message.tx_hash, message.log_index]
+            ), command_id, from_=self._relayer)
+
+        self.last_tx = IAxelarExecutable(message.destination_address, chain=message.destination_chain).execute(
+            command_id,
+            source_chain_name,
+            str(message.sender),
+            message.payload,
+            from_=self._relayer,
+        )
+        return self.last_tx
+
+    def call_contract_call(
+        self,
+        source_chain: Chain,
+        sender: Address,
+        destination_chain: Chain,
+        destination_address: Address,
+        payload: bytes,
+    ) -> None:
+        """
+        Executes a `ContractCall` message on the destination chain with an `eth_call`, without sending the source transaction.
+        Reverts are raised as with a relayed transaction. Requires `direct_approvals`; the approval is revoked afterwards.
+        """
+        assert self._approvals is not None, "direct_approvals required"
+        gateway = self._gateways[destination_chain]
+        source_chain_name = self._chain_names[source_chain]
+        command_id = self._next_command_id()
+        payload_hash = keccak256(payload)
+
+        self._approvals.approve(gateway, command_id, source_chain_name, str(sender), destination_address, payload_hash)
+        try:
+            IAxelarExecutable(destination_address, chain=destination_chain).execute(
+                command_id,
+                source_chain_name,
+                str(sender),
+                payload,
+                from_=self._relayer,
+                request_type="call",
+            )
+        finally:
+            self._approvals.approve(
+                gateway, command_id, source_chain_name, str(sender), destination_address, payload_hash, approved=False
+            )
+
+    def _next_command_id(self) -> bytes:
+        command_id = self.command_counter.to_bytes(32, "big")
+        self.command_counter += 1
+        return command_id
+
+    def _relay_contract_call(self, tx: TransactionAbc, index: int, topics: List[bytes], decoded: tuple) -> None:
+        destination_chain_name, destination_address_str, payload = decoded
+        destination_chain = self._chains[destination_chain_name]
+        message = Message(
+            tx.chain,
+            Address("0x" + topics[1][12:].hex()),
+            destination_chain,
+            Address(destination_address_str),
+            payload,
+            topics[2],
+            bytes.fromhex(tx.tx_hash[2:]),
+            index,
+            self._round,
+        )
+
+        if self.deferred:
+            self._queues[destination_chain].append(message)
+        else:
+            self.deliver(message)
+
+    def _relay_contract_call_with_token(self, tx: TransactionAbc, index: int, topics: List[bytes], decoded: tuple) -> None:
+        destination_chain_name, destination_address_str, payload, symbol, amount = decoded
+        sender = Address("0x" + topics[1][12:].hex())
+        destination_chain = self._chains[destination_chain_name]
+        source_chain_name = self._chain_names[tx.chain]
+        command_id = self._next_command_id()
+
+        self._gateways[destination_chain].approveContractCallWithMint(Abi.encode(
+            ["string", "string", "address", "bytes32", "string", "uint256", "bytes32", "uint256"],
+            [source_chain_name, str(sender), Address(destination_address_str), topics[2], symbol, amount, bytes.fromhex(tx.tx_hash[2:]), index]
+        ), command_id, from_=self._relayer)
+
+        self.last_tx = IAxelarExecutable(destination_address_str, chain=destination_chain).executeWithToken(
+            command_id,
+            source_chain_name,
+            str(sender),
+            payload,
+            symbol,
+            amount,
+            from_=self._relayer,
+        )
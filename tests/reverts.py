@@ -0,0 +1,19 @@
+from typing import Literal
+
+from wake.testing import *
+from wake.testing.fuzzing import *
+
+
+def predicted_request_type(verify_probability: float) -> Literal["call", "tx"]:
+    """
+    Request type for a call whose revert is fully determined by the Python model.
+    The revert is checked with a call request, except for `verify_probability` of the cases sent as a full transaction.
+    """
+    return "tx" if random_bool(true_prob=verify_probability) else "call"
+
+
+def send_predicted_revert(account: Account, data: bytes, from_: Account, verify_probability: float) -> None:
+    if predicted_request_type(verify_probability) == "tx":
+        account.transact(data, from_=from_)
+    else:
+        account.call(data, from_=from_)
@@ -0,0 +1,202 @@
+import logging
+import random
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from wake.testing import *
+from wake.testing.fuzzing import *
+from pytypes.source.contracts.interfaces.IAxelarGateway import IAxelarGateway
+from pytypes.source.contracts.AxelarGateway import AxelarGateway
+from pytypes.source.contracts.governance.AxelarServiceGovernance import AxelarServiceGovernance
+from pytypes.tests.Multicall import Multicall
+
+from .admin_upgrade import admin_upgrade
+from .approvals import ApprovalSlotResolver
+from .encoding import encode_call_cached
+from .fixtures import FixtureFuzzTest
+from .fork_state import fork_state
+from .indexed_set import IndexedSet
+from .models import MultisigProposal
+from .multicall import BatchRead
+from .reverts import send_predicted_revert
+from .votes import SignerVotes
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+FORK_URL = "http://localhost:8545"
+FORK_BLOCK = 17435092
+# mainnet hash of FORK_BLOCK, checked against the fork on capture and against the captured file on replay;
+# None until it is pinned from a mainnet node, fork_state then warns that the block is not verified
+FORK_BLOCK_HASH: Optional[str] = None
+FORK_STATE = Path(__file__).parent / "fork_states" / "axelar_gateway_upgrade_fuzz.json"
+
+
+class GatewayUpgradeFuzzTest(FixtureFuzzTest):
+    """
+    Governance-driven upgrades of the mainnet gateway proxy.
+
+    `pre_test` runs the expensive forked part once: it deploys the implementations and the governance and has the
+    admins upgrade the proxy to hand it over to the governance. Every sequence starts from the snapshot taken after it.
+    """
+    IMPLEMENTATIONS_COUNT = 3
+    PREDICTED_REVERT_VERIFY_PROBABILITY = 0.1
+
+    _proxy: IAxelarGateway
+    _governance: AxelarServiceGovernance
+    _multicall: Multicall
+    _approvals: ApprovalSlotResolver
+    _implementations: List[AxelarGateway]
+    _upgrade_calldata: Dict[Address, bytes]
+    _initial_implementation: Address
+    _command_counter: int
+
+    _implementation: Address
+    _votes: SignerVotes
+    _approved: IndexedSet[MultisigProposal]
+
+    def pre_test(self) -> None:
+        a = default_chain.accounts[0]
+
+        self._proxy = IAxelarGateway("0x4F4495243837681061C4743b74B3eEdf548D56A5")
+        self._implementations = [
+            AxelarGateway.deploy(self._proxy.authModule(), self._proxy.tokenDeployer(), from_=a)
+            for _ in range(self.IMPLEMENTATIONS_COUNT)
+        ]
+        # code hashes are read once, upgrade calldata is the same in every sequence
+        self._upgrade_calldata = {
+            impl.address: Abi.encode_call(IAxelarGateway.upgrade, [impl, keccak256(impl.code), b""])
+            for impl in self._implementations
+        }
+        self._governance = AxelarServiceGovernance.deploy(self._proxy, "mainnet", "", 0, [a], 1, from_=a)
+        self._multicall = Multicall.deploy(from_=a)
+        self._approvals = ApprovalSlotResolver(AxelarGateway)
+        self._command_counter = 0
+
+        initial = self._implementations[0]
+        admin_upgrade(self._proxy, initial, Abi.encode(["address", "address", "bytes"], [self._governance, a, b""]))
+        assert self._proxy.implementation() == initial.address
+        self._initial_implementation = initial.address
+
+    def pre_sequence(self) -> None:
+        a = default_chain.accounts[0]
+
+        signers = sorted(random.sample(default_chain.accounts, random_int(1, len(default_chain.accounts))))
+        threshold = random_int(1, len(signers))
+        # the governance is deployed with `a` as the only signer, a single vote rotates it to the sequence signers
+        self._governance.rotateSigners(signers, threshold, from_=a)
+        self._votes = SignerVotes(signers, threshold)
+        self._implementation = self._initial_implementation
+        self._approved = IndexedSet()
+
+    def _upgrade_proposal(self) -> MultisigProposal:
+        implementations = [impl for impl in self._implementations if impl.address != self._implementation]
+        return MultisigProposal(self._proxy.address, self._upgrade_calldata[random.choice(implementations).address], 0)
+
+    def _execute_command(self, payload: bytes) -> TransactionAbc:
+        command_id = self._command_counter.to_bytes(32, "big")
+        self._command_counter += 1
+        # every implementation shares the AxelarGateway layout, a single calibration serves the whole campaign
+        self._approvals.approve(self._proxy, command_id, "mainnet", "", self._governance.address, keccak256(payload))
+        return self._governance.execute(command_id, "mainnet", "", payload, from_=random_account())
+
+    @flow()
+    def flow_approve_upgrade(self) -> None:
+        proposal = self._upgrade_proposal()
+        self._execute_command(proposal.approve_payload())
+        self._approved.add(proposal)
+
+        logger.debug(f"approved upgrade {proposal.calldata.hex()}")
+
+    @flow(weight=30)
+    def flow_cancel_approval(self) -> None:
+        if len(self._approved) == 0:
+            return
+        proposal = self._approved.choice()
+        self._execute_command(proposal.cancel_approval_payload())
+        self._approved.remove(proposal)
+
+        logger.debug(f"cancelled approval of upgrade {proposal.calldata.hex()}")
+
+    @flow(weight=300)
+    def flow_sign_upgrade(self) -> None:
+        # upgrades to the current implementation are never proposed, approvals targeting it wait for another upgrade
+        approved = [p for p in self._approved if p.calldata != self._upgrade_calldata[self._implementation]]
+        if len(approved) > 0 and random_bool(true_prob=0.8):
+            proposal = random.choice(approved)
+        else:
+            proposal = self._upgrade_proposal()
+        calldata = encode_call_cached(
+            AxelarServiceGovernance.executeMultisigProposal, [proposal.target, proposal.calldata, proposal.native_value]
+        )
+        topic = keccak256(calldata)
+        caller = random_account()
+
+        if not self._votes.is_signer(caller):
+            with must_revert(AxelarServiceGovernance.NotSigner()):
+                send_predicted_revert(self._governance, calldata, caller, self.PREDICTED_REVERT_VERIFY_PROBABILITY)
+        elif self._votes.has_voted(topic, caller):
+            with must_revert(AxelarServiceGovernance.AlreadyVoted()):
+                send_predicted_revert(self._governance, calldata, caller, self.PREDICTED_REVERT_VERIFY_PROBABILITY)
+        elif self._votes.is_last_vote(topic):
+            if proposal not in self._approved:
+                with must_revert(AxelarServiceGovernance.NotApproved()):
+                    send_predicted_revert(self._governance, calldata, caller, self.PREDICTED_REVERT_VERIFY_PROBABILITY)
+            else:
+                tx = self._governance.transact(calldata, from_=caller)
+                assert AxelarServiceGovernance.MultisigOperationExecuted(topic) in tx.events
+                self._votes.clear(topic)
+                self._approved.remove(proposal)
+                implementation = next(
+                    impl.address for impl in self._implementations if self._upgrade_calldata[impl.address] == proposal.calldata
+                )
+                self._implementation = implementation
+
+                logger.info(f"{caller} upgraded the gateway to {implementation}")
+        else:
+            tx = self._governance.transact(calldata, from_=caller)
+            assert len(tx.events) == 0
+            self._votes.vote(topic, caller)
+
+    @flow(weight=20)
+    def flow_sign_rotate(self) -> None:
+        accounts = sorted(random.sample(default_chain.accounts, random_int(1, len(default_chain.accounts))))
+        threshold = random_int(1, len(accounts))
+
+        calldata = encode_call_cached(AxelarServiceGovernance.rotateSigners, [accounts, threshold])
+        topic = keccak256(calldata)
+        caller = random_account()
+
+        if not self._votes.is_signer(caller):
+            with must_revert(AxelarServiceGovernance.NotSigner()):
+                send_predicted_revert(self._governance, calldata, caller, self.PREDICTED_REVERT_VERIFY_PROBABILITY)
+        elif self._votes.has_voted(topic, caller):
+            with must_revert(AxelarServiceGovernance.AlreadyVoted()):
+                send_predicted_revert(self._governance, calldata, caller, self.PREDICTED_REVERT_VERIFY_PROBABILITY)
+        else:
+            tx = self._governance.transact(calldata, from_=caller)
+            if self._votes.is_last_vote(topic):
+                assert AxelarServiceGovernance.MultisigOperationExecuted(topic) in tx.events
+                self._votes.rotate(accounts, threshold)
+
+                logger.info(f"{caller} rotated signers to {accounts} with threshold {threshold}")
+            else:
+                assert len(tx.events) == 0
+                self._votes.vote(topic, caller)
+
+    @invariant(period=10)
+    def invariant_implementation(self) -> None:
+        assert self._proxy.implementation() == self._implementation
+
+    @invariant(period=10)
+    def invariant_signers(self) -> None:
+        batch = BatchRead(self._multicall)
+        for account in default_chain.accounts:
+            batch.add(AxelarServiceGovernance.isSigner, self._governance, [account])
+        assert batch.execute() == [self._votes.is_signer(account) for account in default_chain.accounts]
+
+
+def test_axelar_gateway_upgrade_fuzz():
+    with fork_state(FORK_STATE, FORK_URL, FORK_BLOCK, block_hash=FORK_BLOCK_HASH):
+        GatewayUpgradeFuzzTest().run(100, 100)
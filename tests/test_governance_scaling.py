@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import pytest
+from wake.testing import *
+from wake.testing.fuzzing import *
+
+from pytypes.axelarnetwork.axelargmpsdksolidity.contracts.test.MockGateway import MockGateway
+from pytypes.source.contracts.governance.AxelarServiceGovernance import AxelarServiceGovernance
+from pytypes.source.contracts.governance.Multisig import Multisig
+from pytypes.tests.GovernanceMock import GovernanceMock
+from pytypes.tests.PayloadSinkMock import PayloadSinkMock
+
+from .gas import percentile
+from .relay import Relayer
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+SIGNER_COUNTS = [int(count) for count in os.environ.get("SCALING_SIGNER_COUNTS", "10,100,500,1000").split(",")]
+CALLDATA_SIZES = [int(size) for size in os.environ.get("SCALING_CALLDATA_SIZES", "0,1024,4096,16384,32768").split(",")]
+RESULTS_DIR = Path(".wake/benchmarks")
+# the benchmarks are slow, a plain `wake test` skips them
+BENCH_ENABLED = os.environ.get("FUZZ_BENCH", "0") == "1"
+# rotating a thousand signers does not fit the default 30M block gas limit
+BLOCK_GAS_LIMIT = 1_000_000_000
+
+
+def write_results(name: str, rows: List[Dict[str, Any]]) -> None:
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    (RESULTS_DIR / f"{name}.json").write_text(json.dumps(rows, indent=4) + "\n")
+
+    columns = list(rows[0].keys())
+    print(" ".join(f"{column:>16}" for column in columns))
+    for row in rows:
+        print(" ".join(f"{'-' if row[column] is None else row[column]:>16}" for column in columns))
+
+
+def timed(send: Callable[[], TransactionAbc]) -> Tuple[TransactionAbc, float]:
+    start = time.perf_counter()
+    tx = send()
+    return tx, time.perf_counter() - start
+
+
+def signer_scaling(name: str, multisig: Account, owner: Account) -> List[Dict[str, Any]]:
+    """
+    `multisig` must have `owner` as its only signer with threshold 1. For every signer count and threshold
+    the owner rotates the signers to freshly generated accounts (a single executing vote), then the new signers
+    vote the rotation back to the owner, one transaction each.
+    """
+    rows = []
+    reset_calldata = Abi.encode_call(Multisig.rotateSigners, [[owner], 1])
+
+    for count in SIGNER_COUNTS:
+        # transactions from the generated accounts are sent through impersonation, the gas price is 0
+        signers = sorted(Account(random_address()) for _ in range(count))
+        for threshold in sorted({1, max(1, count // 2), count}):
+            calldata = Abi.encode_call(Multisig.rotateSigners, [signers, threshold])
+            rotate_tx, rotate_time = timed(lambda: multisig.transact(calldata, from_=owner))
+
+            vote_gas = []
+            vote_times = []
+            for signer in signers[:threshold - 1]:
+                tx, vote_time = timed(lambda: multisig.transact(reset_calldata, from_=signer))
+                assert len(tx.raw_events) == 0
+                vote_gas.append(tx.gas_used)
+                vote_times.append(vote_time)
+            final_tx, final_time = timed(lambda: multisig.transact(reset_calldata, from_=signers[threshold - 1]))
+            # MultisigOperationExecuted, declared by both contracts
+            assert len(final_tx.raw_events) > 0
+
+            vote_gas.sort()
+            rows.append({
+                "contract": name,
+                "signers": count,
+                "threshold": threshold,
+                "rotate_gas": rotate_tx.gas_used,
+                "rotate_ms": round(rotate_time * 1000, 2),
+                "vote_gas_p50": percentile(vote_gas, 50) if len(vote_gas) > 0 else None,
+                "vote_gas_max": vote_gas[-1] if len(vote_gas) > 0 else None,
+                "vote_ms_mean": round(sum(vote_times) / len(vote_times) * 1000, 2) if len(vote_times) > 0 else None,
+                "final_vote_gas": final_tx.gas_used,
+                "final_vote_ms": round(final_time * 1000, 2),
+            })
+            logger.info(f"{name}: {count} signers, threshold {threshold} done")
+
+    return rows
+
+
+@pytest.mark.skipif(not BENCH_ENABLED, reason="set FUZZ_BENCH=1 to run the benchmarks")
+@default_chain.connect()
+def test_signer_scaling():
+    default_chain.block_gas_limit = BLOCK_GAS_LIMIT
+    a = default_chain.accounts[0]
+
+    gateway = MockGateway.deploy(from_=a)
+    multisig = Multisig.deploy([a], 1, from_=a)
+    governance = AxelarServiceGovernance.deploy(gateway, "chain1", "", 0, [a], 1, from_=a)
+
+    write_results("signer_scaling", [
+        *signer_scaling("Multisig", multisig, a),
+        *signer_scaling("AxelarServiceGovernance", governance, a),
+    ])
+
+
+@pytest.mark.skipif(not BENCH_ENABLED, reason="set FUZZ_BENCH=1 to run the benchmarks")
+@default_chain.connect()
+def test_calldata_scaling():
+    default_chain.block_gas_limit = BLOCK_GAS_LIMIT
+    a = default_chain.accounts[0]
+
+    gateway = MockGateway.deploy(from_=a)
+    relayer = Relayer({default_chain: gateway}, {default_chain: "chain1"}, a.address, direct_approvals=True)
+    relayer.install()
+    try:
+        governance_mock = GovernanceMock.deploy(gateway, from_=a)
+        governance = AxelarServiceGovernance.deploy(gateway, "chain1", str(governance_mock.address), 0, [a], 1, from_=a)
+        # the sink only accepts the call, the cost of a target processing the calldata is not part of the measurement
+        sink = PayloadSinkMock.deploy(from_=a)
+
+        rows = []
+        for size in CALLDATA_SIZES:
+            calldata = bytes(random_bytes(size, size))
+            _, schedule_time = timed(lambda: governance_mock.scheduleProposal(
+                "chain1", str(governance.address), sink, calldata, 0, 0, from_=a
+            ))
+            schedule_tx = relayer.last_tx
+            assert any(isinstance(e, AxelarServiceGovernance.ProposalScheduled) for e in schedule_tx.events)
+
+            execute_tx, execute_time = timed(lambda: governance.executeProposal(sink, calldata, 0, from_=a))
+
+            rows.append({
+                "calldata_size": size,
+                "schedule_gas": schedule_tx.gas_used,
+                "schedule_ms": round(schedule_time * 1000, 2),
+                "execute_gas": execute_tx.gas_used,
+                "execute_ms": round(execute_time * 1000, 2),
+            })
+    finally:
+        default_chain.tx_callback = None
+
+    write_results("calldata_scaling", rows)
@@ -1,166 +1,168 @@
 import logging
+import os
 import random
-from dataclasses import dataclass
-from typing import Dict, Set
+from typing import Callable, Dict, Optional
 from wake.testing import *
 from wake.testing.fuzzing import *
-from pytypes.axelarnetwork.axelargmpsdksolidity.contracts.interfaces.IAxelarExecutable import IAxelarExecutable
 
 from pytypes.source.contracts.governance.InterchainGovernance import InterchainGovernance
 from pytypes.axelarnetwork.axelargmpsdksolidity.contracts.test.MockGateway import MockGateway
 from pytypes.tests.GovernanceMock import GovernanceMock
+from pytypes.tests.Multicall import Multicall
 from pytypes.tests.PayloadReceiverMock import PayloadReceiverMock
 
+from .clock import ChainClock
+from .eta_queue import EtaQueue
+from .fast_deploy import fast_deploy
+from .fixtures import FixtureFuzzTest
+from .gas import GasCollector, gas_seed
+from .invariants import IncrementalCheck
+from .ledger import BalanceLedger
+from .mesh import ChainMesh
+from .models import GovernanceCommand, Proposal, decode_command
+from .multicall import BatchRead
+from .parallel import run_sharded
+from .profiling import profiled
+from .receipts import received
+from .relay import Relayer
+from .reverts import predicted_request_type
+
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
-chain1 = Chain()
-chain2 = Chain()
-
-
-@dataclass(frozen=True)
-class Proposal:
-    target: Address
-    calldata: bytes
-    native_value: uint256
-    eta: uint256
-
-
-class InterchainGovernanceFuzzTest(FuzzTest):
-    _command_counter: int
+mesh = ChainMesh.create(int(os.environ.get("FUZZ_CHAINS", "2")))
+gas = GasCollector()
+
+
+class InterchainGovernanceFuzzTest(FixtureFuzzTest):
+    READY_EXECUTE_RATIO = 0.9
+    NEXT_ETA_ROLL_PROBABILITY = 0.25
+    ETAS_FULL_SWEEP_PERIOD = 10
+    PREDICTED_REVERT_VERIFY_PROBABILITY = 0.1
+    TREASURY = 10 ** 18
+    STORAGE_CROSS_CHECK_PROBABILITY = 0.1
+    # queue relayed messages and deliver them from flow_deliver_messages instead of the source transaction
+    DEFERRED_DELIVERY = False
+    DELIVERY_BATCH = 4
+    DELIVERY_DELAY = 2
+    DELIVERY_REORDER = True
+
+    _relayer: Relayer
     _gateways: Dict[Chain, MockGateway]
     _governance_mocks: Dict[Chain, GovernanceMock]
+    # chain whose GovernanceMock the governance on a chain accepts messages from
+    _governance_chains: Dict[Chain, Chain]
+    _multicalls: Dict[Chain, Multicall]
     _minimal_etas: Dict[Chain, uint256]
     _governances: Dict[Chain, InterchainGovernance]
-    _proposals: Dict[Chain, Set[Proposal]]
+    _clocks: Dict[Chain, ChainClock]
+    _proposals: Dict[Chain, EtaQueue[Proposal]]
+    # scheduled proposals by hash, a delivered message does not carry the eta a proposal was scheduled with
+    _scheduled: Dict[Chain, Dict[bytes, Proposal]]
+    _ledgers: Dict[Chain, BalanceLedger]
+    _eta_checks: Dict[Chain, IncrementalCheck[Proposal]]
     _payload_receivers: Dict[Chain, List[PayloadReceiverMock]]
 
-    def _relay(self, tx: TransactionAbc) -> None:
-        a = chain1.accounts[0].address
-
-        for index, event in enumerate(tx.raw_events):
-            if len(event.topics) == 0:
-                continue
+    def pre_test(self) -> None:
+        a = mesh.chains[0].accounts[0].address
 
-            if event.topics[0] == MockGateway.ContractCall.selector:
-                sender = Abi.decode(["address"], event.topics[1])[0]
-                destination_chain_name, destination_address_str, payload = Abi.decode(
-                    ["string", "string", "bytes"], event.data
-                )
-                destination_chain = chain2 if destination_chain_name == "chain2" else chain1
-                destination_gw = self._gateways[destination_chain]
-                source_chain_name = "chain1" if destination_chain_name == "chain2" else "chain2"
-                command_id = self._command_counter.to_bytes(32, "big")
-
-                destination_gw.approveContractCall(Abi.encode(
-                    ["string", "string", "address", "bytes32", "bytes32", "uint256"],
-                    [source_chain_name, str(sender), Address(destination_address_str), event.topics[2], bytes.fromhex(tx.tx_hash[2:]), index]
-                ), command_id, from_=a)
-
-                self._last_relay_tx = IAxelarExecutable(destination_address_str, chain=destination_chain).execute(
-                    command_id,
-                    source_chain_name,
-                    str(sender),
-                    payload,
-                    from_=a,
-                )
-                self._command_counter += 1
-            elif event.topics[0] == MockGateway.ContractCallWithToken.selector:
-                sender = Abi.decode(["address"], event.topics[1])[0]
-                destination_chain_name, destination_address_str, payload, symbol, amount = Abi.decode(
-                    ["string", "string", "bytes", "string", "uint256"], event.data
-                )
-                destination_chain = chain2 if destination_chain_name == "chain2" else chain1
-                destination_gw = self._gateways[destination_chain]
-                source_chain_name = "chain1" if destination_chain_name == "chain2" else "chain2"
-                command_id = self._command_counter.to_bytes(32, "big")
-
-                destination_gw.approveContractCallWithMint(Abi.encode(
-                    ["string", "string", "address", "bytes32", "string", "uint256", "bytes32", "uint256"],
-                    [source_chain_name, str(sender), Address(destination_address_str), event.topics[2], symbol, amount, bytes.fromhex(tx.tx_hash[2:]), index]
-                    ), command_id, from_=a)
-
-                self._last_relay_tx = IAxelarExecutable(destination_address_str, chain=destination_chain).executeWithToken(
-                    command_id,
-                    source_chain_name,
-                    str(sender),
-                    payload,
-                    symbol,
-                    amount,
-                    from_=a,
-                )
-                self._command_counter += 1
+        mesh.deploy(a, deferred=self.DEFERRED_DELIVERY, delivery_delay=self.DELIVERY_DELAY)
+        self._gateways = mesh.gateways
+        self._relayer = mesh.relayer
+        self._governance_mocks = mesh.governance_mocks
+        self._multicalls = {
+            chain: Multicall.deploy(from_=a, chain=chain) for chain in mesh.chains
+        }
+        self._payload_receivers = {
+            chain: [fast_deploy(PayloadReceiverMock, chain=chain) for _ in range(20)] for chain in mesh.chains
+        }
 
     def pre_sequence(self) -> None:
-        self._command_counter = 0
-        chain1.tx_callback = self._relay
-        chain2.tx_callback = self._relay
-
-        assert chain1.accounts[0].address == chain2.accounts[0].address
-        a = chain1.accounts[0].address
+        a = mesh.chains[0].accounts[0].address
 
-        self._gateways = {
-            chain1: MockGateway.deploy(from_=a, chain=chain1),
-            chain2: MockGateway.deploy(from_=a, chain=chain2),
-        }
-        self._governance_mocks = {
-            chain1: GovernanceMock.deploy(self._gateways[chain1], from_=a, chain=chain1),
-            chain2: GovernanceMock.deploy(self._gateways[chain2], from_=a, chain=chain2),
-        }
         self._minimal_etas = {
-            chain1: random_int(0, 1_000),
-            chain2: random_int(0, 1_000),
+            chain: random_int(0, 1_000) for chain in mesh.chains
+        }
+        self._governance_chains = {
+            chain: mesh.random_other(chain) for chain in mesh.chains
         }
         self._governances = {
-            chain1: InterchainGovernance.deploy(
-                self._gateways[chain1],
-                "chain2",
-                str(self._governance_mocks[chain2].address),
-                self._minimal_etas[chain1],
+            chain: InterchainGovernance.deploy(
+                self._gateways[chain],
+                mesh.name(self._governance_chains[chain]),
+                str(self._governance_mocks[self._governance_chains[chain]].address),
+                self._minimal_etas[chain],
                 from_=a,
-                chain=chain1,
-            ),
-            chain2: InterchainGovernance.deploy(
-                self._gateways[chain2],
-                "chain1",
-                str(self._governance_mocks[chain1].address),
-                self._minimal_etas[chain2],
-                from_=a,
-                chain=chain2,
-            ),
+                chain=chain,
+            )
+            for chain in mesh.chains
         }
-        assert self._governances[chain1].minimumTimeLockDelay() == self._minimal_etas[chain1]
-        assert self._governances[chain2].minimumTimeLockDelay() == self._minimal_etas[chain2]
+        for chain in mesh.chains:
+            assert self._governances[chain].minimumTimeLockDelay() == self._minimal_etas[chain]
+        self._clocks = {
+            chain: ChainClock(chain) for chain in mesh.chains
+        }
+        self._ledgers = {
+            chain: BalanceLedger(self._multicalls[chain]) for chain in mesh.chains
+        }
+        for chain in mesh.chains:
+            # native values of executed proposals are paid from the treasury
+            self._ledgers[chain].fund(self._governances[chain], self.TREASURY)
+            self._ledgers[chain].track([*chain.accounts, *self._payload_receivers[chain]])
         self._proposals = {
-            chain1: set(),
-            chain2: set(),
+            chain: EtaQueue() for chain in mesh.chains
         }
-        self._payload_receivers = {
-            chain1: [PayloadReceiverMock.deploy(from_=a, chain=chain1) for _ in range(20)],
-            chain2: [PayloadReceiverMock.deploy(from_=a, chain=chain2) for _ in range(20)],
+        self._scheduled = {
+            chain: {} for chain in mesh.chains
         }
+        self._eta_checks = {
+            chain: IncrementalCheck(self.ETAS_FULL_SWEEP_PERIOD) for chain in mesh.chains
+        }
+        # messages left queued by the previous sequence were sent on the reverted chains
+        self._relayer.clear()
+
+    def pre_flow(self, flow: Callable) -> None:
+        if flow is not type(self).flow_roll_time:
+            for clock in self._clocks.values():
+                clock.flush()
+
+    def _add_proposal(self, chain: Chain, proposal: Proposal) -> None:
+        self._proposals[chain].add(proposal)
+        self._scheduled[chain][proposal.hash] = proposal
+        self._eta_checks[chain].mark(proposal)
+
+    def _remove_proposal(self, chain: Chain, proposal: Proposal) -> None:
+        self._proposals[chain].remove(proposal)
+        del self._scheduled[chain][proposal.hash]
+        self._eta_checks[chain].discard(proposal)
+
+    def _scheduled_eta(self, chain: Chain, proposal: Proposal, timestamp: int) -> Proposal:
+        minimal_eta = timestamp + self._minimal_etas[chain]
+        if proposal.eta >= minimal_eta:
+            return proposal
+        return Proposal(proposal.target, proposal.calldata, proposal.native_value, minimal_eta)
 
     @flow()
     def flow_schedule_proposal(self):
-        source_chain = random.choice([chain1, chain2])
-        destination_chain = chain2 if source_chain == chain1 else chain1
+        destination_chain = random.choice(mesh.chains)
+        source_chain = self._governance_chains[destination_chain]
 
         proposal = Proposal(
             target=random.choice(self._payload_receivers[destination_chain]).address,
             calldata=bytes(random_bytes(0, 100)),
             native_value=random_int(0, 1_000),
-            eta=destination_chain.blocks["pending"].timestamp + random_int(-100, 1_000)
+            eta=self._clocks[destination_chain].now + random_int(-100, 1_000)
         )
-        while proposal in self._proposals[destination_chain]:
+        while proposal.hash in self._scheduled[destination_chain]:
             proposal = Proposal(
                 target=random.choice(self._payload_receivers[destination_chain]).address,
                 calldata=bytes(random_bytes(0, 100)),
                 native_value=random_int(0, 1_000),
-                eta=destination_chain.blocks["pending"].timestamp + random_int(-100, 1_000)
+                eta=self._clocks[destination_chain].now + random_int(-100, 1_000)
             )
 
         self._governance_mocks[source_chain].scheduleProposal(
-            f"chain{destination_chain.chain_id}",
+            mesh.name(destination_chain),
             str(self._governances[destination_chain].address),
             proposal.target,
             proposal.calldata,
@@ -168,55 +170,69 @@ class InterchainGovernanceFuzzTest(FuzzTest):
             proposal.eta,
             from_=random_account(chain=source_chain),
         )
-        schedule_events = [e for e in self._last_relay_tx.events if isinstance(e, InterchainGovernance.ProposalScheduled)]
+        if self._relayer.deferred:
+            # the model is updated when the message is delivered, see flow_deliver_messages
+            return
+
+        schedule_events = [e for e in self._relayer.last_tx.events if isinstance(e, InterchainGovernance.ProposalScheduled)]
         assert len(schedule_events) == 1
+        gas.record("schedule (relay)", self._relayer.last_tx)
 
         with must_revert(InterchainGovernance.TimeLockAlreadyScheduled):
-            self._governance_mocks[source_chain].scheduleProposal(
-                f"chain{destination_chain.chain_id}",
-                str(self._governances[destination_chain].address),
-                proposal.target,
-                proposal.calldata,
-                proposal.native_value,
-                proposal.eta,
-                from_=random_account(chain=source_chain),
-            )
-
-        if proposal.eta < self._last_relay_tx.block.timestamp + self._minimal_etas[destination_chain]:
-            proposal = Proposal(
-                proposal.target,
-                proposal.calldata,
-                proposal.native_value,
-                self._last_relay_tx.block.timestamp + self._minimal_etas[destination_chain],
-            )
+            if predicted_request_type(self.PREDICTED_REVERT_VERIFY_PROBABILITY) == "tx":
+                self._governance_mocks[source_chain].scheduleProposal(
+                    mesh.name(destination_chain),
+                    str(self._governances[destination_chain].address),
+                    proposal.target,
+                    proposal.calldata,
+                    proposal.native_value,
+                    proposal.eta,
+                    from_=random_account(chain=source_chain),
+                )
+            else:
+                # the resend reverts on the destination chain, execute the relayed message there directly
+                self._relayer.call_contract_call(
+                    source_chain,
+                    self._governance_mocks[source_chain].address,
+                    destination_chain,
+                    self._governances[destination_chain].address,
+                    proposal.schedule_payload(),
+                )
 
-        self._proposals[destination_chain].add(proposal)
+        timestamp = self._relayer.last_tx.block.timestamp
+        self._clocks[destination_chain].sync(timestamp)
+        proposal = self._scheduled_eta(destination_chain, proposal, timestamp)
+        self._add_proposal(destination_chain, proposal)
 
-        logger.info(f"Proposal scheduled on chain{destination_chain.chain_id}: {proposal}")
+        logger.info(f"Proposal scheduled on {mesh.name(destination_chain)}: {proposal}")
 
     @flow()
     def flow_cancel_proposal(self):
-        chains = [chain for chain in [chain1, chain2] if len(self._proposals[chain]) > 0]
+        chains = [chain for chain in mesh.chains if len(self._proposals[chain]) > 0]
         if len(chains) == 0:
             return
 
         destination_chain = random.choice(chains)
-        source_chain = chain2 if destination_chain == chain1 else chain1
+        source_chain = self._governance_chains[destination_chain]
 
-        proposal = random.choice(list(self._proposals[destination_chain]))
+        proposal = self._proposals[destination_chain].choice()
 
         self._governance_mocks[source_chain].cancelProposal(
-            f"chain{destination_chain.chain_id}",
+            mesh.name(destination_chain),
             str(self._governances[destination_chain].address),
             proposal.target,
             proposal.calldata,
             proposal.native_value,
             from_=random_account(chain=source_chain),
         )
-        cancel_events = [e for e in self._last_relay_tx.events if isinstance(e, InterchainGovernance.ProposalCancelled)]
+        if self._relayer.deferred:
+            return
+
+        cancel_events = [e for e in self._relayer.last_tx.events if isinstance(e, InterchainGovernance.ProposalCancelled)]
         assert len(cancel_events) == 1
+        gas.record("cancel (relay)", self._relayer.last_tx)
 
-        self._proposals[destination_chain].remove(proposal)
+        self._remove_proposal(destination_chain, proposal)
 
         with must_revert(InterchainGovernance.InvalidTimeLockHash):
             self._governances[destination_chain].executeProposal(
@@ -224,20 +240,23 @@ class InterchainGovernanceFuzzTest(FuzzTest):
                 proposal.calldata,
                 proposal.native_value,
                 from_=random_account(chain=destination_chain),
+                request_type=predicted_request_type(self.PREDICTED_REVERT_VERIFY_PROBABILITY),
             )
 
-        logger.info(f"Proposal cancelled on chain{destination_chain.chain_id}: {proposal}")
+        logger.info(f"Proposal cancelled on {mesh.name(destination_chain)}: {proposal}")
 
     @flow()
     def flow_execute_proposal(self):
-        chains = [chain for chain in [chain1, chain2] if len(self._proposals[chain]) > 0]
+        chains = [chain for chain in mesh.chains if len(self._proposals[chain]) > 0]
         if len(chains) == 0:
             return
 
         chain = random.choice(chains)
-        proposal = random.choice(list(self._proposals[chain]))
-
-        self._governances[chain].balance += proposal.native_value
+        proposals = self._proposals[chain]
+        proposals.update(self._clocks[chain].now)
+        # a ready proposal is executable in the next block, a waiting one is only tried at the remaining ratio
+        ready = len(proposals.waiting) == 0 or (len(proposals.ready) > 0 and random_bool(true_prob=self.READY_EXECUTE_RATIO))
+        proposal = proposals.ready.choice() if ready else proposals.waiting.choice()
 
         with may_revert() as e:
             tx = self._governances[chain].executeProposal(
@@ -248,15 +267,25 @@ class InterchainGovernanceFuzzTest(FuzzTest):
             )
 
         if e.value is not None:
+            assert not ready
             assert e.value.tx.block.timestamp < proposal.eta
+            self._clocks[chain].sync(e.value.tx.block.timestamp)
 
-            logger.info(f"Proposal execution reverted on chain{chain.chain_id}: {proposal}")
+            logger.info(f"Proposal execution reverted on {mesh.name(chain)}: {proposal}")
         else:
             assert tx.block.timestamp >= proposal.eta
-            assert PayloadReceiverMock(proposal.target, chain=chain).lastPayload() == proposal.calldata
-            assert PayloadReceiverMock(proposal.target, chain=chain).lastValue() == proposal.native_value
-
-            self._proposals[chain].remove(proposal)
+            gas.record("executeProposal", tx)
+            self._clocks[chain].sync(tx.block.timestamp)
+            target = PayloadReceiverMock(proposal.target, chain=chain)
+            assert received(tx, target) == [(keccak256(proposal.calldata), proposal.native_value)]
+            if random_bool(true_prob=self.STORAGE_CROSS_CHECK_PROBABILITY):
+                batch = BatchRead(self._multicalls[chain])
+                batch.add(PayloadReceiverMock.lastPayload, target)
+                batch.add(PayloadReceiverMock.lastValue, target)
+                assert batch.execute() == [proposal.calldata, proposal.native_value]
+
+            self._remove_proposal(chain, proposal)
+            self._ledgers[chain].transfer(self._governances[chain], target, proposal.native_value)
 
             with must_revert(InterchainGovernance.InvalidTimeLockHash):
                 self._governances[chain].executeProposal(
@@ -264,31 +293,79 @@ class InterchainGovernanceFuzzTest(FuzzTest):
                     proposal.calldata,
                     proposal.native_value,
                     from_=random_account(chain=chain),
+                    request_type=predicted_request_type(self.PREDICTED_REVERT_VERIFY_PROBABILITY),
                 )
 
-            logger.info(f"Proposal executed on chain{chain.chain_id}: {proposal}")
+            logger.info(f"Proposal executed on {mesh.name(chain)}: {proposal}")
+
+    @flow(precondition=lambda self: self.DEFERRED_DELIVERY)
+    def flow_deliver_messages(self):
+        chains = [chain for chain in mesh.chains if self._relayer.pending(chain) > 0]
+        if len(chains) == 0:
+            return
+
+        chain = random.choice(chains)
+        for message in self._relayer.take(chain, self.DELIVERY_BATCH, reorder=self.DELIVERY_REORDER):
+            command, proposal = decode_command(message.payload)
+            scheduled: Optional[Proposal] = self._scheduled[chain].get(proposal.hash)
+
+            if command == GovernanceCommand.SCHEDULE_TIME_LOCK_PROPOSAL and scheduled is not None:
+                with must_revert(InterchainGovernance.TimeLockAlreadyScheduled) as e:
+                    self._relayer.deliver(message)
+                self._clocks[chain].sync(e.value.tx.block.timestamp)
+
+                logger.info(f"Proposal already scheduled on {mesh.name(chain)}: {proposal}")
+            elif command == GovernanceCommand.SCHEDULE_TIME_LOCK_PROPOSAL:
+                tx = self._relayer.deliver(message)
+                assert len([e for e in tx.events if isinstance(e, InterchainGovernance.ProposalScheduled)]) == 1
+                gas.record("schedule (relay)", tx)
+                self._clocks[chain].sync(tx.block.timestamp)
+                proposal = self._scheduled_eta(chain, proposal, tx.block.timestamp)
+                self._add_proposal(chain, proposal)
+
+                logger.info(f"Proposal scheduled on {mesh.name(chain)}: {proposal}")
+            else:
+                # cancelling a proposal which is not scheduled (anymore or yet) does not revert
+                assert command == GovernanceCommand.CANCEL_TIME_LOCK_PROPOSAL
+                tx = self._relayer.deliver(message)
+                assert len([e for e in tx.events if isinstance(e, InterchainGovernance.ProposalCancelled)]) == 1
+                gas.record("cancel (relay)", tx)
+                self._clocks[chain].sync(tx.block.timestamp)
+                if scheduled is not None:
+                    self._remove_proposal(chain, scheduled)
+
+                logger.info(f"Proposal cancelled on {mesh.name(chain)}: {proposal}")
 
     @flow(weight=200)
     def flow_roll_time(self):
-        chain = random.choice([chain1, chain2])
-        chain.mine(lambda x: x + random_int(1, 1_000))
+        chain = random.choice(mesh.chains)
+        next_eta = self._proposals[chain].next_eta()
+        # no block is mined, the next transaction on the chain applies the advance
+        if next_eta is not None and random_bool(true_prob=self.NEXT_ETA_ROLL_PROBABILITY):
+            self._clocks[chain].advance_to(next_eta)
+        else:
+            self._clocks[chain].advance(random_int(1, 1_000))
+
+    @invariant(period=10)
+    def invariant_balances(self):
+        for chain in mesh.chains:
+            self._ledgers[chain].check()
 
     @invariant(period=10)
     def invariant_etas(self):
-        for chain in [chain1, chain2]:
+        for chain in mesh.chains:
             governance = self._governances[chain]
-            for proposal in self._proposals[chain]:
-                assert governance.getProposalEta(
-                    proposal.target,
-                    proposal.calldata,
-                    proposal.native_value
-                ) == proposal.eta
+            batch = BatchRead(self._multicalls[chain])
+            # only proposals scheduled since the last check, every ETAS_FULL_SWEEP_PERIOD-th check all of them
+            proposals = list(self._eta_checks[chain].items_to_check(self._proposals[chain]))
+            for proposal in proposals:
+                batch.add(InterchainGovernance.getProposalEta, governance, [proposal.target, proposal.calldata, proposal.native_value])
+                batch.add(InterchainGovernance.getTimeLock, governance, [proposal.hash])
 
-                hash = keccak256(Abi.encode_packed(
-                    ["address", "bytes", "uint256"],
-                    [proposal.target, proposal.calldata, proposal.native_value],
-                ))
-                assert governance.getTimeLock(hash) == proposal.eta
+            results = batch.execute()
+            for proposal, eta, timelock in zip(proposals, results[0::2], results[1::2]):
+                assert eta == proposal.eta
+                assert timelock == proposal.eta
 
 
 def revert_handler(e: TransactionRevertedError):
@@ -297,8 +374,19 @@ def revert_handler(e: TransactionRevertedError):
         print(e.tx.console_logs)
 
 
-@chain1.connect(chain_id=1)
-@chain2.connect(chain_id=2)
-@on_revert(revert_handler)
+class DeferredInterchainGovernanceFuzzTest(InterchainGovernanceFuzzTest):
+    DEFERRED_DELIVERY = True
+
+
 def test_interchain_governance():
-    InterchainGovernanceFuzzTest().run(10, 10_000)
+    gas.clear()
+    seed = gas_seed()
+    run_sharded(profiled(InterchainGovernanceFuzzTest), mesh.chain_ids(), 10, 10_000, revert_handler=revert_handler, base_seed=seed, gas=gas)
+    gas.check_baseline("interchain_governance", seed)
+
+
+def test_interchain_governance_deferred():
+    gas.clear()
+    seed = gas_seed()
+    run_sharded(profiled(DeferredInterchainGovernanceFuzzTest), mesh.chain_ids(), 10, 10_000, revert_handler=revert_handler, base_seed=seed, gas=gas)
+    gas.check_baseline("interchain_governance_deferred", seed)
@@ -1,50 +1,107 @@
 import logging
 import random
 from collections import defaultdict
-from typing import List, Set, DefaultDict
+from typing import Callable, List, DefaultDict, Optional
 
 from wake.testing import *
 from wake.testing.fuzzing import *
 from pytypes.source.contracts.governance.Multisig import Multisig
+from pytypes.tests.Multicall import Multicall
 from pytypes.tests.PayloadReceiverMock import PayloadReceiverMock
 
+from .batching import BlockBatch
+from .encoding import encode_call_cached
+from .fast_deploy import fast_deploy
+from .fixtures import FixtureFuzzTest
+from .gas import GasCollector, gas_seed
+from .ledger import BalanceLedger
+from .multicall import BatchRead
+from .profiling import profiled
+from .receipts import received
+from .reverts import send_predicted_revert
+from .votes import SignerVotes
+
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
+gas = GasCollector()
+
 
+class MultisigFuzzTest(FixtureFuzzTest):
+    PREDICTED_REVERT_VERIFY_PROBABILITY = 0.1
+    # flows whose transactions are mined together in one block, 1 mines every transaction on its own
+    BATCH_FLOWS = 1
+    STORAGE_CROSS_CHECK_PROBABILITY = 0.1
 
-class MultisigFuzzTest(FuzzTest):
     _multisig: Multisig
-    _threshold: int
+    _multicall: Multicall
     _payload_receivers: List[PayloadReceiverMock]
-    _signers: Set[Account]
-    _signatures: DefaultDict[bytes, Set[Account]]
+    _votes: SignerVotes
 
     _last_payloads: DefaultDict[PayloadReceiverMock, bytes]
     _last_values: DefaultDict[PayloadReceiverMock, int]
+    _ledger: BalanceLedger
+    _batch: Optional[BlockBatch]
 
     _payloads: List[bytes]
     _native_values: List[int]
 
+    def pre_test(self) -> None:
+        a = default_chain.accounts[0]
+
+        self._multicall = Multicall.deploy(from_=a)
+        self._payload_receivers = [fast_deploy(PayloadReceiverMock) for _ in range(5)]
+
     def pre_sequence(self) -> None:
         a = default_chain.accounts[0]
 
         accounts = random.sample(default_chain.accounts, random_int(1, len(default_chain.accounts)))
-        self._threshold = random_int(1, len(accounts))
+        self._votes = SignerVotes(accounts, random_int(1, len(accounts)))
         self._multisig = Multisig.deploy(
             accounts,
-            self._threshold,
+            self._votes.threshold,
             from_=a,
         )
-        self._payload_receivers = [PayloadReceiverMock.deploy(from_=a) for _ in range(5)]
-        self._signers = set(accounts)
-        self._signatures = defaultdict(set)
         self._last_payloads = defaultdict(bytes)
         self._last_values = defaultdict(int)
+        self._ledger = BalanceLedger(self._multicall)
+        self._ledger.track([*default_chain.accounts, *self._payload_receivers, self._multisig])
+        self._batch = BlockBatch(default_chain) if self.BATCH_FLOWS > 1 else None
 
-        self._payloads = [b""] + [random_bytes(1, 32) for _ in range(4)]
+        self._payloads = [b""] + [bytes(random_bytes(1, 32)) for _ in range(4)]
         self._native_values = [0] + [random_int(1, 1000) for _ in range(4)]
 
+    def _send(
+        self,
+        calldata: bytes,
+        caller: Account,
+        *,
+        value: int = 0,
+        expected_error: Optional[TransactionRevertedError] = None,
+        on_success: Optional[Callable[[TransactionAbc], None]] = None,
+    ) -> None:
+        if self._batch is not None:
+            self._batch.send(self._multisig, calldata, caller, value=value, expected_error=expected_error, on_success=on_success)
+        elif expected_error is not None:
+            with must_revert(expected_error):
+                send_predicted_revert(self._multisig, calldata, caller, self.PREDICTED_REVERT_VERIFY_PROBABILITY)
+        else:
+            tx = self._multisig.transact(calldata, value=value, from_=caller)
+            if on_success is not None:
+                on_success(tx)
+
+    def pre_invariant(self, invariant: Callable) -> None:
+        if self._batch is not None:
+            self._batch.mine()
+
+    def post_flow(self, flow: Callable) -> None:
+        if self._batch is not None and len(self._batch) >= self.BATCH_FLOWS:
+            self._batch.mine()
+
+    def post_sequence(self) -> None:
+        if self._batch is not None:
+            self._batch.mine()
+
     @flow()
     def flow_sign_execute(self) -> None:
         target = random.choice(self._payload_receivers)
@@ -52,76 +109,127 @@ class MultisigFuzzTest(FuzzTest):
         native_value = random.choice(self._native_values)
         caller = random_account()
 
-        caller_balance = caller.balance
-        multisig_balance = self._multisig.balance
-        target_balance = target.balance
-
-        calldata = Abi.encode_call(Multisig.execute, [target, payload, native_value])
-
-        if caller not in self._signers:
-            with must_revert(Multisig.NotSigner()):
-                self._multisig.transact(calldata, from_=caller)
-        elif caller in self._signatures[calldata]:
-            with must_revert(Multisig.AlreadyVoted()):
-                self._multisig.transact(calldata, from_=caller)
-        elif len(self._signatures[calldata]) + 1 == self._threshold:
-            caller.balance += native_value
-            tx = self._multisig.transact(calldata, value=native_value, from_=caller)
-            assert Multisig.MultisigOperationExecuted(keccak256(calldata)) in tx.events
-
-            assert caller.balance == caller_balance
-            assert self._multisig.balance == multisig_balance
-            assert target.balance == target_balance + native_value
-            assert target.lastPayload() == payload
-            assert target.lastValue() == native_value
-
-            self._signatures[calldata].clear()
+        calldata = encode_call_cached(Multisig.execute, [target, payload, native_value])
+        topic = keccak256(calldata)
+
+        if not self._votes.is_signer(caller):
+            self._send(calldata, caller, expected_error=Multisig.NotSigner())
+        elif self._votes.has_voted(topic, caller):
+            self._send(calldata, caller, expected_error=Multisig.AlreadyVoted())
+        elif self._votes.is_last_vote(topic):
+            def check_executed(tx: TransactionAbc) -> None:
+                assert Multisig.MultisigOperationExecuted(topic) in tx.events
+                assert received(tx, target) == [(keccak256(payload), native_value)]
+                gas.record("execute", tx)
+
+            self._send(calldata, caller, value=native_value, on_success=check_executed)
+            # the native value is forwarded from the last signer, see invariant_balances
+            self._ledger.transfer(caller, target, native_value)
+
+            # the Received event is checked in the receipt, the receiver storage only in a sample of executions
+            # the state after a batched transaction is only known once the block is mined, see invariant_receivers
+            if self._batch is None and random_bool(true_prob=self.STORAGE_CROSS_CHECK_PROBABILITY):
+                batch = BatchRead(self._multicall)
+                batch.add(PayloadReceiverMock.lastPayload, target)
+                batch.add(PayloadReceiverMock.lastValue, target)
+                assert batch.execute() == [payload, native_value]
+
+            self._votes.clear(topic)
 
             self._last_payloads[target] = payload
             self._last_values[target] = native_value
 
             logger.info(f"{caller} executed {calldata} with value {native_value}")
         else:
-            tx = self._multisig.transact(calldata, from_=caller)
-            assert len(tx.events) == 0
+            self._send(calldata, caller, on_success=self._check_vote("execute vote"))
 
-            assert target.lastPayload() == self._last_payloads[target]
-            assert target.lastValue() == self._last_values[target]
+            if self._batch is None and random_bool(true_prob=self.STORAGE_CROSS_CHECK_PROBABILITY):
+                batch = BatchRead(self._multicall)
+                batch.add(PayloadReceiverMock.lastPayload, target)
+                batch.add(PayloadReceiverMock.lastValue, target)
+                assert batch.execute() == [self._last_payloads[target], self._last_values[target]]
 
-            self._signatures[calldata].add(caller)
+            self._votes.vote(topic, caller)
 
     @flow()
     def flow_sign_rotate(self) -> None:
         accounts = sorted(random.sample(default_chain.accounts, random_int(1, len(default_chain.accounts))))
         threshold = random_int(1, len(accounts))
 
-        calldata = Abi.encode_call(Multisig.rotateSigners, [accounts, threshold])
+        calldata = encode_call_cached(Multisig.rotateSigners, [accounts, threshold])
+        topic = keccak256(calldata)
         caller = random_account()
 
-        with may_revert() as e:
-            tx = self._multisig.transact(calldata, from_=caller)
+        if not self._votes.is_signer(caller):
+            self._send(calldata, caller, expected_error=Multisig.NotSigner())
+        elif self._votes.has_voted(topic, caller):
+            self._send(calldata, caller, expected_error=Multisig.AlreadyVoted())
+        elif self._votes.is_last_vote(topic):
+            def check_executed(tx: TransactionAbc) -> None:
+                assert Multisig.MultisigOperationExecuted(topic) in tx.events
+                gas.record("rotateSigners", tx)
+
+            self._send(calldata, caller, on_success=check_executed)
+            self._votes.rotate(accounts, threshold)
 
-        if caller not in self._signers:
-            assert e.value == Multisig.NotSigner()
-        elif caller in self._signatures[calldata]:
-            assert e.value == Multisig.AlreadyVoted()
+            logger.info(f"{caller} rotated signers to {accounts} with threshold {threshold}")
         else:
-            assert e.value is None
-            if len(self._signatures[calldata]) + 1 == self._threshold:
-                assert Multisig.MultisigOperationExecuted(keccak256(calldata)) in tx.events
-                self._signatures.clear()
-                self._signers = set(accounts)
-                self._threshold = threshold
+            self._send(calldata, caller, on_success=self._check_vote("rotateSigners vote"))
+            self._votes.vote(topic, caller)
+
+            #logger.info(f"{caller} signed {calldata}")
+
+    @staticmethod
+    def _check_vote(operation: str) -> Callable[[TransactionAbc], None]:
+        def check(tx: TransactionAbc) -> None:
+            assert len(tx.raw_events) == 0
+            gas.record(operation, tx)
+
+        return check
 
-                logger.info(f"{caller} rotated signers to {accounts} with threshold {threshold}")
-            else:
-                self._signatures[calldata].add(caller)
-                assert len(tx.events) == 0
+    @invariant(period=10)
+    def invariant_receivers(self) -> None:
+        batch = BatchRead(self._multicall)
+        for target in self._payload_receivers:
+            batch.add(PayloadReceiverMock.lastPayload, target)
+            batch.add(PayloadReceiverMock.lastValue, target)
+        assert batch.execute() == [
+            value
+            for target in self._payload_receivers
+            for value in (self._last_payloads[target], self._last_values[target])
+        ]
 
-                #logger.info(f"{caller} signed {calldata}")
+    @invariant(period=10)
+    def invariant_balances(self) -> None:
+        self._ledger.check()
 
+    @invariant(period=10)
+    def invariant_signers(self) -> None:
+        batch = BatchRead(self._multicall)
+        for account in default_chain.accounts:
+            batch.add(Multisig.isSigner, self._multisig, [account])
+        assert batch.execute() == [self._votes.is_signer(account) for account in default_chain.accounts]
+
+
+class BatchedMultisigFuzzTest(MultisigFuzzTest):
+    BATCH_FLOWS = 8
 
 
 @default_chain.connect()
 def test_multisig():
-    MultisigFuzzTest().run(10, 10_000)
+    gas.clear()
+    seed = gas_seed()
+    if seed is not None:
+        random.seed(seed)
+    profiled(MultisigFuzzTest)().run(10, 10_000)
+    gas.check_baseline("multisig", seed)
+
+
+@default_chain.connect()
+def test_multisig_batched():
+    gas.clear()
+    seed = gas_seed()
+    if seed is not None:
+        random.seed(seed)
+    profiled(BatchedMultisigFuzzTest)().run(10, 10_000)
+    gas.check_baseline("multisig_batched", seed)
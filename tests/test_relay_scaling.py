@@ -0,0 +1,66 @@
+import logging
+import os
+import random
+import time
+from contextlib import ExitStack
+from typing import Dict
+
+import pytest
+from wake.testing import *
+from wake.testing.fuzzing import *
+
+from pytypes.tests.PayloadReceiverMock import PayloadReceiverMock
+
+from .mesh import ChainMesh
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+MESH_SIZES = [int(size) for size in os.environ.get("RELAY_SCALING_SIZES", "2,4,8").split(",")]
+MESSAGES_COUNT = int(os.environ.get("RELAY_SCALING_MESSAGES", "100"))
+# the benchmark is slow, a plain `wake test` skips it
+BENCH_ENABLED = os.environ.get("FUZZ_BENCH", "0") == "1"
+
+
+def relay_cost(size: int, messages_count: int) -> float:
+    """
+    Mean wall time in seconds of one governance message sent and relayed between random chains of a mesh of `size` chains.
+    """
+    mesh = ChainMesh.create(size)
+    with ExitStack() as stack:
+        for chain, chain_id in mesh.chain_ids().items():
+            stack.enter_context(chain.connect(chain_id=chain_id))
+
+        a = mesh.chains[0].accounts[0].address
+        mesh.deploy(a)
+        receivers = {
+            chain: PayloadReceiverMock.deploy(from_=a, chain=chain) for chain in mesh.chains
+        }
+
+        start = time.perf_counter()
+        for _ in range(messages_count):
+            source_chain = random.choice(mesh.chains)
+            destination_chain = mesh.random_other(source_chain)
+            mesh.governance_mocks[source_chain].scheduleProposal(
+                mesh.name(destination_chain),
+                str(receivers[destination_chain].address),
+                random_address(),
+                random_bytes(0, 100),
+                0,
+                random_int(0, 1_000),
+                from_=random_account(chain=source_chain),
+            )
+            assert mesh.relayer.last_tx.chain == destination_chain
+        return (time.perf_counter() - start) / messages_count
+
+
+@pytest.mark.skipif(not BENCH_ENABLED, reason="set FUZZ_BENCH=1 to run the benchmarks")
+def test_relay_scaling():
+    costs: Dict[int, float] = {}
+    for size in MESH_SIZES:
+        costs[size] = relay_cost(size, MESSAGES_COUNT)
+        logger.info(f"{size} chains: {costs[size] * 1000:.2f} ms per relayed message")
+
+    for size, cost in costs.items():
+        print(f"{size:>4} chains {cost * 1000:>10.2f} ms/message {cost / costs[MESH_SIZES[0]]:>6.2f}x")
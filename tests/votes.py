@@ -0,0 +1,56 @@
+from typing import Dict, FrozenSet, Iterable
+
+from wake.testing import *
+
+
+class SignerVotes:
+    """
+    Multisig votes of the current signer set.
+
+    Votes are keyed on the 32-byte topic `keccak256(calldata)` and stored as a bitmask over signer indices;
+    the vote count is the popcount of the mask. `rotate` replaces the signer set and drops all votes, as Multisig
+    only counts votes of the current signer epoch. Lookups never create entries, so topics that are only
+    probed do not accumulate.
+    """
+    __slots__ = ("_indices", "_threshold", "_votes")
+
+    _indices: Dict[Account, int]
+    _threshold: int
+    _votes: Dict[bytes, int]
+
+    def __init__(self, signers: Iterable[Account], threshold: int):
+        self.rotate(signers, threshold)
+
+    @property
+    def signers(self) -> FrozenSet[Account]:
+        return frozenset(self._indices.keys())
+
+    @property
+    def threshold(self) -> int:
+        return self._threshold
+
+    def __len__(self) -> int:
+        return len(self._votes)
+
+    def rotate(self, signers: Iterable[Account], threshold: int) -> None:
+        self._indices = {signer: i for i, signer in enumerate(signers)}
+        self._threshold = threshold
+        self._votes = {}
+
+    def is_signer(self, account: Account) -> bool:
+        return account in self._indices
+
+    def has_voted(self, topic: bytes, account: Account) -> bool:
+        return (self._votes.get(topic, 0) >> self._indices[account]) & 1 == 1
+
+    def votes_count(self, topic: bytes) -> int:
+        return bin(self._votes.get(topic, 0)).count("1")
+
+    def is_last_vote(self, topic: bytes) -> bool:
+        return self.votes_count(topic) + 1 == self._threshold
+
+    def vote(self, topic: bytes, account: Account) -> None:
+        self._votes[topic] = self._votes.get(topic, 0) | (1 << self._indices[account])
+
+    def clear(self, topic: bytes) -> None:
+        self._votes.pop(topic, None)